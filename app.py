@@ -1,14 +1,27 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
 import logging
-import joblib
+import os
 
-from src.config import PROCESSED_PATH
-from src.models.prediction import predict
+from src.models.cache import cached_predict
+from src.models.registry import registry
+from src.models.prediction import predict_all
+from src.models.ensemble import ENSEMBLE_KEY
 from src.utils.form import fetch_input, interpret_probability, display_model_info, load_custom_styles, model_selector
 from src.utils.gauge import generate_gauge_chart
+from src.utils.interpretation import load_probability_bands, load_operating_threshold
+from src.utils.what_if_chart import generate_what_if_chart
+from src.models.what_if import what_if_analysis
 from src.utils.advice import generate_advice
+from src.utils.explainer import get_explainer, explain_prediction, explained_model
+from src.utils.logging_config import configure_logging
+from src.utils.instrumentation import metrics
+from src.utils.drift import drift_monitor
+from src.config import METRICS_PATH, DRIFT_PATH
+
+# --- Configure Logging and Metrics Export ---
+configure_logging()
+metrics.start_exporter(METRICS_PATH)
+drift_monitor.start_flusher(DRIFT_PATH)
 
 # --- Streamlit Page Config ---
 st.set_page_config(page_title='Loan Eligibility Prediction', layout='centered')
@@ -21,21 +34,12 @@ st.title('🏦 Loan Eligibility Prediction App')
 
 # --- Model Selection ---
 model_key = model_selector()
-model_path = f"models/{model_key}_model.pkl"
-metrics_path = f"models/{model_key}_metrics.json"
-scaler_path = "models/scaler.pkl"
-
-# --- Configure Logging ---
-logging.basicConfig(filename='loan_app.log', level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+metrics_path = os.path.join(registry.base_path, f"{model_key}_metrics.json")
 
-# --- Load Model, Scaler, Processed Data ---
+# --- Load Model and Preprocessor (cached per process, reloaded when retrained) ---
 try:
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
-    df_processed = pd.read_csv(PROCESSED_PATH)
-    feature_order = df_processed.drop('Loan_Approved', axis=1).columns.tolist()
-
-    logging.info("Model, scaler, and processed data loaded successfully.")
+    model = registry.scoring_model(model_key)
+    preprocessor = registry.preprocessor()
 
 except Exception as e:
     st.error(f"Error loading model or data: {e}")
@@ -52,18 +56,56 @@ user_input = fetch_input()
 if user_input:
     with st.spinner('Making prediction...'):
         try:
-            prediction_proba, user_processed = predict(user_input, df_processed, model, scaler, feature_order)
-            interpretation, color = interpret_probability(prediction_proba)
-
-            # Display only Gauge
+            if model_key == ENSEMBLE_KEY:
+                # Every member scores the same preprocessed row; their probabilities are shown below
+                prediction_proba, user_processed, model_probabilities = cached_predict(
+                    user_input, model_key, scorer=predict_all)
+            else:
+                prediction_proba, user_processed = cached_predict(user_input, model_key)
+                model_probabilities = None
+            interpretation, color = interpret_probability(prediction_proba, load_probability_bands(metrics_path))
+
+            # Gauge next to the what-if surface (whole grid scored in one call)
             st.subheader("📊 Loan Approval Probability")
-            gauge = generate_gauge_chart(prediction_proba, interpretation, color)
-            st.plotly_chart(gauge, use_container_width=True)
+            gauge_column, what_if_column = st.columns(2)
+            with gauge_column:
+                with metrics.span('gauge'):
+                    gauge = generate_gauge_chart(prediction_proba, interpretation, color)
+                st.plotly_chart(gauge, use_container_width=True)
+
+            with what_if_column:
+                try:
+                    scaler = None if getattr(model, 'includes_scaling', False) else registry.scaler()
+                    what_if = what_if_analysis(user_input, preprocessor, model, scaler,
+                                               target=load_operating_threshold(metrics_path))
+                    st.plotly_chart(generate_what_if_chart(what_if), use_container_width=True)
+                except Exception as e:
+                    what_if = None
+                    logging.warning("What-if analysis unavailable: %s", e)
+
+            if what_if is not None:
+                with st.expander('🔀 What would change the outcome?'):
+                    effect = "would take the probability below" if what_if['approved'] else "would lift the probability to"
+                    st.write(f"Smallest single changes that {effect} the {what_if['target']:.0f}% operating threshold:")
+                    for feature, change in what_if['smallest_changes'].items():
+                        if change is None:
+                            st.write(f"**{feature}**: no value in the tested range crosses the threshold")
+                        else:
+                            st.write(f"**{feature}**: {change['from']:,.0f} → {change['to']:,.0f} "
+                                     f"({change['change']:+,.0f}, probability {change['probability']:.1f}%)")
+
+            if model_probabilities:
+                with st.expander('🧮 Per-Model Probabilities'):
+                    for name, probability in model_probabilities.items():
+                        weight = model.weights[name]
+                        st.write(f"**{name.replace('_', ' ').title()}**: {probability:.1f}% (weight {weight:.2f})")
 
             logging.info("Prediction successful with probability: %.2f", prediction_proba)
+            metrics.increment('loan_predictions_total', model=model_key)
 
             # --- Loan Officer Advice ---
-            loan_advice = generate_advice(user_input)
+            with metrics.span('advice'):
+                loan_advice = generate_advice(user_input)
 
             with st.expander('📋 Loan Officer Advice'):
                 if loan_advice:
@@ -72,6 +114,23 @@ if user_input:
                 else:
                     st.info("No specific advice for this applicant.")
 
+            # --- Key Factors (SHAP, explainer cached per model; the ensemble has no single model to explain
+            # and gradient boosting's native categoricals have no one-hot features to attribute to) ---
+            if model_key != ENSEMBLE_KEY and not getattr(model, 'takes_raw_input', False):
+                try:
+                    # The sklearn model and scaler are only unpickled here, after the first prediction is shown
+                    top_features = explain_prediction(
+                        explained_model(model_key), user_processed, scaler=registry.scaler(),
+                        explainer=get_explainer(model_key)
+                    )
+                    with st.expander('🔍 Key Factors'):
+                        for row in top_features.itertuples():
+                            direction = "raises" if row.contribution > 0 else "lowers"
+                            st.write(f"**{row.feature}** {direction} the approval chance ({row.contribution:+.3f})")
+                except Exception as e:
+                    logging.warning("Explanation unavailable: %s", e)
+
         except Exception as e:
             logging.error("Error during prediction: %s", e)
+            metrics.increment('loan_prediction_errors_total', model=model_key)
             st.error(f"Error during prediction: {e}")
@@ -0,0 +1,365 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import MinMaxScaler
+
+from src.config import RAW_PATH
+from src.data_processing.data_loader import load_data
+from src.data_processing.preprocessing import preprocess_data, Preprocessor
+from src.data_processing.features import split_and_scale_train_test
+from src.data_processing.synthetic import generate_synthetic, write_synthetic_csv
+from src.models.compiled import COMPILED_SUFFIX, load_compiled_model
+from src.models.boosting import HIST_GRADIENT_BOOSTING_KEY
+from src.models.compaction import COMPACT_MODEL_KEY
+from src.models.prediction import predict, predict_batch
+from src.models.storage import load_model, load_scaler, load_preprocessor, resolve_artifact_dir
+from src.models.training import train_random_forest, train_logistic_regression, train_hist_gradient_boosting
+from src.utils.logging_config import configure_logging
+from src.utils.startup import startup_report, format_startup_report
+
+# Configure logging
+configure_logging()
+
+MODEL_KEYS = ("logistic_regression", "random_forest", HIST_GRADIENT_BOOSTING_KEY)
+SAMPLE_APPLICANT = {
+    'Gender': 'Male', 'Married': 'Yes', 'Dependents': '0', 'Education': 'Graduate', 'Self_Employed': 'No',
+    'ApplicantIncome': 4000, 'CoapplicantIncome': 1500, 'LoanAmount': 120, 'Loan_Amount_Term': '360',
+    'Credit_History': '1.0', 'Property_Area': 'Urban'
+}
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def _latency_summary(samples):
+    samples_ms = np.asarray(samples) * 1000
+    return {
+        "iterations": len(samples_ms),
+        "mean_ms": float(samples_ms.mean()),
+        "p50_ms": float(np.percentile(samples_ms, 50)),
+        "p95_ms": float(np.percentile(samples_ms, 95)),
+        "p99_ms": float(np.percentile(samples_ms, 99)),
+    }
+
+def _load_artifacts(artifact_dir):
+    preprocessor = load_preprocessor(os.path.join(artifact_dir, "preprocessor.pkl"))
+    scaler = load_scaler(os.path.join(artifact_dir, "scaler.pkl"))
+    models = {}
+    for key in MODEL_KEYS:
+        model_path = os.path.join(artifact_dir, f"{key}_model.pkl")
+        if not os.path.exists(model_path):
+            # Bundles from before a model was added
+            continue
+        models[key] = load_model(model_path)
+        compiled_path = os.path.join(artifact_dir, f"{key}{COMPILED_SUFFIX}")
+        if os.path.isdir(compiled_path):
+            models[f"{key}_compiled"] = load_compiled_model(compiled_path)
+    compact_path = os.path.join(artifact_dir, f"{COMPACT_MODEL_KEY}{COMPILED_SUFFIX}")
+    if os.path.isdir(compact_path):
+        models[COMPACT_MODEL_KEY] = load_compiled_model(compact_path)
+    return preprocessor, scaler, models
+
+def bench_single_predict(preprocessor, scaler, models, iterations=500):
+    """
+    Latency percentiles of one predict() call per model.
+    """
+    results = {}
+    for name, model in models.items():
+        predict(SAMPLE_APPLICANT, preprocessor, model, scaler)  # warm-up
+        samples = [_timed(predict, SAMPLE_APPLICANT, preprocessor, model, scaler)[1] for _ in range(iterations)]
+        results[name] = _latency_summary(samples)
+    return results
+
+def bench_batch_throughput(raw_df, preprocessor, scaler, models, sizes):
+    """
+    Rows per second of predict_batch per model and batch size.
+    """
+    results = {}
+    for size in sizes:
+        batch = generate_synthetic(raw_df, size, random_state=size)
+        for name, model in models.items():
+            _, seconds = _timed(predict_batch, batch, preprocessor, model, scaler)
+            results.setdefault(name, []).append({"rows": size, "seconds": seconds, "rows_per_second": size / seconds})
+    return results
+
+def bench_data_pipeline(raw_df, sizes):
+    """
+    Wall-clock of preprocess_data and split_and_scale_train_test per dataset size.
+    """
+    results = []
+    for size in sizes:
+        df = generate_synthetic(raw_df, size, random_state=size)
+        processed, preprocess_seconds = _timed(preprocess_data, df)
+        _, split_seconds = _timed(split_and_scale_train_test, processed)
+        results.append({"rows": size, "preprocess_seconds": preprocess_seconds,
+                        "split_and_scale_seconds": split_seconds})
+    return results
+
+def bench_training(raw_df, sizes):
+    """
+    Fit time of both models per training set size.
+    """
+    results = []
+    for size in sizes:
+        processed = preprocess_data(generate_synthetic(raw_df, size, random_state=size))
+        X_train, _, y_train, _, _, _ = split_and_scale_train_test(processed)
+        _, forest_seconds = _timed(train_random_forest, X_train, y_train)
+        _, logistic_seconds = _timed(train_logistic_regression, X_train, y_train)
+        results.append({"rows": size, "random_forest_seconds": forest_seconds,
+                        "logistic_regression_seconds": logistic_seconds})
+    return results
+
+def bench_model_comparison(raw_df, sizes, iterations=200, test_rows=10_000):
+    """
+    Training time, inference latency and held-out accuracy of every model per training set size.
+
+    Training rows are generated from 80% of the reference applicants and test rows
+    from the other 20%, so no bootstrapped copy of a test applicant is trained on
+    (a split of one synthetic set would reward memorizing). The one-hot models also
+    pay preprocess_data and scaling, which gradient boosting skips; both are reported.
+    """
+    reference_train, reference_test = train_test_split(
+        raw_df, test_size=0.2, random_state=42, stratify=raw_df['Loan_Approved'])
+    test_df = generate_synthetic(reference_test, test_rows, random_state=0)
+    y_test = test_df['Loan_Approved'].map({'Y': 1, 'N': 0}).to_numpy()
+
+    results = []
+    for size in sizes:
+        train_df = generate_synthetic(reference_train, size, random_state=size)
+        y_train = train_df['Loan_Approved'].map({'Y': 1, 'N': 0})
+
+        processed, preprocess_seconds = _timed(preprocess_data, train_df)
+        preprocessor = Preprocessor().fit(train_df)
+        scaler = MinMaxScaler()
+        X_train, scale_seconds = _timed(scaler.fit_transform, processed[preprocessor.feature_names_])
+        prep_seconds = preprocess_seconds + scale_seconds
+        trainers = {
+            "logistic_regression": (lambda: train_logistic_regression(X_train, y_train), prep_seconds),
+            "random_forest": (lambda: train_random_forest(X_train, y_train, n_jobs=os.cpu_count()), prep_seconds),
+            HIST_GRADIENT_BOOSTING_KEY: (lambda: train_hist_gradient_boosting(
+                train_df.drop(columns=['Loan_Approved', 'Loan_ID']), y_train), 0.0),
+        }
+
+        entry = {"rows": size, "models": {}}
+        for name, (train, model_prep_seconds) in trainers.items():
+            model, fit_seconds = _timed(train)
+            if name == "random_forest":
+                model.n_jobs = None
+            probabilities, batch_seconds = _timed(predict_batch, test_df, preprocessor, model, scaler)
+            predict(SAMPLE_APPLICANT, preprocessor, model, scaler)  # warm-up
+            samples = [_timed(predict, SAMPLE_APPLICANT, preprocessor, model, scaler)[1] for _ in range(iterations)]
+            entry["models"][name] = {
+                "prep_seconds": model_prep_seconds,
+                "fit_seconds": fit_seconds,
+                "single_row": _latency_summary(samples),
+                "batch_rows_per_second": len(test_df) / batch_seconds,
+                "accuracy": float(accuracy_score(y_test, probabilities >= 50)),
+                "roc_auc": float(roc_auc_score(y_test, probabilities)),
+            }
+        results.append(entry)
+    return results
+
+def format_model_comparison(results):
+    """
+    Renders bench_model_comparison results as a plain-text table.
+    """
+    lines = [f"{'Rows':>10} {'Model':<24} {'Prep s':>8} {'Fit s':>8} {'p50 ms':>8} {'Batch rows/s':>13} "
+             f"{'Accuracy':>9} {'ROC AUC':>8}"]
+    for entry in results:
+        for name, model in entry["models"].items():
+            lines.append(f"{entry['rows']:>10} {name:<24} {model['prep_seconds']:>8.2f} {model['fit_seconds']:>8.2f} "
+                         f"{model['single_row']['p50_ms']:>8.2f} {model['batch_rows_per_second']:>13,.0f} "
+                         f"{model['accuracy']:>9.2%} {model['roc_auc']:>8.3f}")
+    return "\n".join(lines)
+
+def _peak_memory(func, *args, **kwargs):
+    # A fresh trace per call rather than tracemalloc.reset_peak, which needs Python 3.9
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        held, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak, held
+
+def bench_memory(raw_df, sizes):
+    """
+    Peak memory of load_data, preprocess_data and split_and_scale_train_test per dataset size,
+    with the default dtypes and in compact mode.
+
+    Each size is written to a temporary CSV so the reader's dtypes are part of the
+    measurement. Peaks are allocations traced by tracemalloc (NumPy and pandas buffers
+    and Python objects) above what was held before the step; the overall peak adds what
+    the earlier steps still hold to each step's peak. The final sizes are
+    memory_usage(deep=True) of the resulting frames.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = write_synthetic_csv(raw_df, os.path.join(directory, f"{size}.csv"), size, random_state=size)
+            entry = {"rows": size}
+            for mode, compact in (("default", False), ("compact", True)):
+                df, load_peak, load_held = _peak_memory(load_data, path, compact=compact)
+                processed, preprocess_peak, preprocess_held = _peak_memory(preprocess_data, df, compact=compact)
+                split, split_peak, _ = _peak_memory(split_and_scale_train_test, processed, compact=compact)
+                overall_peak = max(load_peak, load_held + preprocess_peak,
+                                   load_held + preprocess_held + split_peak)
+                entry[mode] = {
+                    "load_peak_bytes": load_peak,
+                    "preprocess_peak_bytes": preprocess_peak,
+                    "split_and_scale_peak_bytes": split_peak,
+                    "overall_peak_bytes": overall_peak,
+                    "raw_bytes": int(df.memory_usage(deep=True).sum()),
+                    "processed_bytes": int(processed.memory_usage(deep=True).sum()),
+                    "scaled_train_bytes": int(split[0].memory_usage(deep=True).sum()),
+                }
+                del df, processed, split
+            results.append(entry)
+    return results
+
+def format_memory_report(results):
+    """
+    Renders bench_memory results as a plain-text table in MiB.
+    """
+    columns = {"load_peak_bytes": "Load peak", "preprocess_peak_bytes": "Prep peak",
+               "split_and_scale_peak_bytes": "Split peak", "overall_peak_bytes": "Peak", "raw_bytes": "Raw",
+               "processed_bytes": "Processed", "scaled_train_bytes": "Scaled X"}
+    lines = [f"{'Rows':>10} {'Mode':<8} " + " ".join(f"{label:>10}" for label in columns.values())]
+    for entry in results:
+        for mode in ("default", "compact"):
+            lines.append(f"{entry['rows']:>10} {mode:<8} "
+                         + " ".join(f"{entry[mode][column] / 2**20:>10.1f}" for column in columns))
+        ratio = entry["compact"]["overall_peak_bytes"] / entry["default"]["overall_peak_bytes"]
+        lines.append(f"{'':>10} {'ratio':<8} overall peak {ratio:.2f}x of default")
+    return "\n".join(lines)
+
+def bench_artifact_load(artifact_dir, repeats=5):
+    """
+    Best-of-N load time of every artifact the app reads.
+    """
+    loaders = {
+        "preprocessor": lambda: load_preprocessor(os.path.join(artifact_dir, "preprocessor.pkl")),
+        "scaler": lambda: load_scaler(os.path.join(artifact_dir, "scaler.pkl")),
+    }
+    for key in MODEL_KEYS:
+        model_path = os.path.join(artifact_dir, f"{key}_model.pkl")
+        if os.path.exists(model_path):
+            loaders[f"{key}_model"] = lambda path=model_path: load_model(path)
+        compiled_path = os.path.join(artifact_dir, f"{key}{COMPILED_SUFFIX}")
+        if os.path.isdir(compiled_path):
+            loaders[f"{key}_compiled"] = lambda path=compiled_path: load_compiled_model(path)
+    compact_path = os.path.join(artifact_dir, f"{COMPACT_MODEL_KEY}{COMPILED_SUFFIX}")
+    if os.path.isdir(compact_path):
+        loaders[COMPACT_MODEL_KEY] = lambda: load_compiled_model(compact_path)
+    return {name: min(_timed(loader)[1] for _ in range(repeats)) for name, loader in loaders.items()}
+
+def bench_cold_start():
+    """
+    Fresh-interpreter import and artifact-load breakdown up to the app's first prediction.
+    """
+    try:
+        return startup_report()
+    except RuntimeError as e:
+        return {"error": str(e)}
+
+def _environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    import sklearn
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit_learn": sklearn.__version__,
+    }
+
+def parse_args():
+    """
+    Parses command line arguments for the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the prediction and training hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000],
+                        help="Synthetic dataset sizes for preprocessing and batch benchmarks (up to 10M).")
+    parser.add_argument("--train-sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Synthetic training set sizes for the training benchmark.")
+    parser.add_argument("--iterations", type=int, default=500, help="Calls per single-row latency benchmark.")
+    parser.add_argument("--skip", nargs="*", default=[],
+                        choices=["single", "batch", "data", "memory", "training", "models", "load", "cold_start"],
+                        help="Benchmarks to leave out.")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Only print the cold-start report and exit non-zero if the time-to-first-prediction target is missed.")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Only print peak memory of the data pipeline with default and compact dtypes per --sizes.")
+    parser.add_argument("--model-report", action="store_true",
+                        help="Only print training time, latency and accuracy of every model per --train-sizes.")
+    parser.add_argument("--output", default=None,
+                        help="JSON file for the results (defaults to benchmarks/results/<timestamp>.json).")
+    return parser.parse_args()
+
+def main():
+    """
+    Runs the selected benchmarks and writes machine-readable results.
+    """
+    args = parse_args()
+    if args.startup_report:
+        report = startup_report()
+        print(format_startup_report(report))
+        sys.exit(0 if report["meets_target"] else 1)
+
+    raw_df = load_data(RAW_PATH)
+    if args.memory_report:
+        print(format_memory_report(bench_memory(raw_df, args.sizes)))
+        return
+    if args.model_report:
+        print(format_model_comparison(bench_model_comparison(raw_df, args.train_sizes, args.iterations)))
+        return
+
+    artifact_dir = resolve_artifact_dir("models")
+    preprocessor, scaler, models = _load_artifacts(artifact_dir)
+
+    results = {"environment": _environment(), "artifact_dir": artifact_dir}
+    benchmarks = {
+        "single": ("single_predict_latency", lambda: bench_single_predict(preprocessor, scaler, models, args.iterations)),
+        "batch": ("batch_throughput", lambda: bench_batch_throughput(raw_df, preprocessor, scaler, models, args.sizes)),
+        "data": ("data_pipeline", lambda: bench_data_pipeline(raw_df, args.sizes)),
+        "memory": ("data_pipeline_memory", lambda: bench_memory(raw_df, args.sizes)),
+        "training": ("training", lambda: bench_training(raw_df, args.train_sizes)),
+        "models": ("model_comparison", lambda: bench_model_comparison(raw_df, args.train_sizes, args.iterations)),
+        "load": ("artifact_load_seconds", lambda: bench_artifact_load(artifact_dir)),
+        "cold_start": ("app_cold_start", bench_cold_start),
+    }
+    for key, (name, run) in benchmarks.items():
+        if key in args.skip:
+            continue
+        print(f"Running {name}...")
+        results[name] = run()
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import logging
+from src.api.server import ScoringService
+from src.utils.logging_config import configure_logging
+
+# Configure logging
+configure_logging()
+
+def parse_args():
+    """
+    Parses command line arguments for the scoring service.
+    """
+    parser = argparse.ArgumentParser(description="Run the local HTTP loan scoring service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind to.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    parser.add_argument("--batch-window-ms", type=float, default=5,
+                        help="How long a micro-batch waits for more requests before scoring.")
+    parser.add_argument("--max-batch-size", type=int, default=256, help="Largest micro-batch scored at once.")
+    parser.add_argument("--max-concurrency", type=int, default=512,
+                        help="Requests in flight before new ones are rejected with 503.")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Prediction results kept in the LRU cache.")
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="Seconds a cached prediction stays valid.")
+    return parser.parse_args()
+
+def main():
+    """
+    Starts the scoring service and serves until interrupted.
+    """
+    args = parse_args()
+    service = ScoringService(
+        host=args.host, port=args.port, window_ms=args.batch_window_ms,
+        max_batch_size=args.max_batch_size, max_concurrency=args.max_concurrency,
+        cache_size=args.cache_size, cache_ttl_seconds=args.cache_ttl,
+    )
+    print(f"Serving loan predictions on http://{args.host}:{args.port} (POST /predict, GET /health, GET /metrics)")
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+
+from src.config import DRIFT_PATH
+from src.data_processing.preprocessing import NUMERIC_COLUMNS
+from src.models.cache import PredictionCache, canonical_key
+from src.models.prediction import predict_batch
+from src.models.what_if import what_if_analysis
+from src.models.registry import registry
+from src.utils.advice import generate_advice
+from src.utils.interpretation import interpret_probability
+from src.utils.instrumentation import metrics
+from src.utils.drift import drift_monitor
+
+
+# Same fields as the Streamlit form in src/utils/form.py::fetch_input
+INPUT_FIELDS = [
+    'Gender', 'Married', 'Dependents', 'Education', 'Self_Employed', 'ApplicantIncome',
+    'CoapplicantIncome', 'LoanAmount', 'Loan_Amount_Term', 'Credit_History', 'Property_Area'
+]
+MODEL_KEYS = ('logistic_regression', 'random_forest', 'random_forest_compact', 'hist_gradient_boosting', 'ensemble')
+MAX_BODY_BYTES = 64 * 1024
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests for one model into a single predict_proba call.
+
+    The first queued request opens a batch; the batch is scored when it reaches
+    max_batch_size or when window_ms has elapsed, whichever comes first.
+    """
+
+    def __init__(self, model_key, window_ms=5, max_batch_size=256):
+        self.model_key = model_key
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue = asyncio.Queue()
+        self._task = None
+        self.batches = 0
+        self.requests = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, user_input):
+        """
+        Queues one applicant and waits for its probability (0-100 scale).
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((user_input, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            inputs = [user_input for user_input, _ in batch]
+            try:
+                # Scoring is CPU bound; keep the event loop free to accept connections
+                probabilities = await loop.run_in_executor(None, self._score, inputs)
+            except Exception as e:
+                logging.error("Micro-batch scoring failed for %s: %s", self.model_key, e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            metrics.increment('loan_microbatches_total', model=self.model_key)
+            metrics.increment('loan_microbatched_requests_total', len(batch), model=self.model_key)
+            for (_, future), probability in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(float(probability))
+
+    def _score(self, inputs):
+        return predict_batch(
+            pd.DataFrame(inputs, columns=INPUT_FIELDS),
+            registry.preprocessor(), registry.scoring_model(self.model_key), registry.scaler(),
+            model_key=self.model_key
+        )
+
+class ScoringService:
+    """
+    Minimal asyncio HTTP/1.1 service exposing POST /predict, POST /what_if, GET /health,
+    GET /metrics (Prometheus text) and GET /drift (input and output drift report).
+    """
+
+    def __init__(self, host='127.0.0.1', port=8000, window_ms=5, max_batch_size=256,
+                 max_concurrency=512, cache_size=4096, cache_ttl_seconds=3600):
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.cache = PredictionCache(cache_size, cache_ttl_seconds)
+        self.batchers = {key: MicroBatcher(key, window_ms, max_batch_size) for key in MODEL_KEYS}
+        self._in_flight = 0
+        self._started_at = None
+
+    async def serve_forever(self):
+        for batcher in self.batchers.values():
+            batcher.start()
+        drift_monitor.start_flusher(DRIFT_PATH)
+        self._started_at = time.time()
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logging.info("Scoring service listening on %s:%d", self.host, self.port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for batcher in self.batchers.values():
+                await batcher.stop()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            status, payload = await self._handle_request(reader)
+        except Exception as e:
+            logging.error("Unhandled error in scoring service: %s", e)
+            status, payload = 500, {'error': 'Internal server error'}
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), PROMETHEUS_CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode() + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            return 400, {'error': 'Malformed request line'}
+        method, target, _ = parts
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        if url.path == '/health' and method == 'GET':
+            return 200, self.health()
+        if url.path == '/metrics' and method == 'GET':
+            return 200, metrics.to_prometheus()
+        if url.path == '/drift' and method == 'GET':
+            return 200, drift_monitor.report()
+        if url.path not in ('/predict', '/what_if'):
+            return 404, {'error': 'Not found'}
+        if method != 'POST':
+            return 405, {'error': f'Use POST for {url.path}'}
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return 400, {'error': 'Invalid Content-Length header'}
+        if length > MAX_BODY_BYTES:
+            return 413, {'error': 'Request body too large'}
+        try:
+            user_input = json.loads(await reader.readexactly(length))
+        except (ValueError, asyncio.IncompleteReadError):
+            return 400, {'error': 'Body must be a JSON object'}
+
+        query = parse_qs(url.query)
+        model_key = query.get('model', ['logistic_regression'])[0]
+        if url.path == '/what_if':
+            try:
+                target = float(query.get('target', [50])[0])
+            except ValueError:
+                return 400, {'error': 'target must be a number'}
+            return await self.what_if(user_input, model_key, target)
+        return await self.predict(user_input, model_key)
+
+    async def predict(self, user_input, model_key='logistic_regression'):
+        """
+        Scores one applicant through the model's micro-batcher.
+
+        Returns:
+            tuple: (HTTP status, JSON-serializable payload)
+        """
+        with metrics.span('request', model=model_key):
+            status, payload = await self._predict(user_input, model_key)
+        metrics.increment('loan_requests_total', model=model_key, status=status)
+        return status, payload
+
+    def _validate(self, user_input, model_key):
+        """
+        Checks a request body.
+
+        Returns:
+            tuple: (error response or None, the input with its numeric fields as floats)
+        """
+        if model_key not in self.batchers:
+            return (400, {'error': f"Unknown model '{model_key}'"}), None
+        if not isinstance(user_input, dict):
+            return (400, {'error': 'Body must be a JSON object'}), None
+        missing = [field for field in INPUT_FIELDS if field not in user_input]
+        if missing:
+            return (400, {'error': f"Missing fields: {', '.join(missing)}"}), None
+        # Rejected here rather than left to the model: a non-numeric value in a coalesced
+        # micro-batch would fail the predict_proba call of every request in it
+        numbers = {}
+        for field in NUMERIC_COLUMNS:
+            try:
+                numbers[field] = float(user_input[field])
+            except (TypeError, ValueError):
+                numbers[field] = math.nan
+            if not math.isfinite(numbers[field]):
+                return (400, {'error': f"{field} must be a finite number"}), None
+        return None, dict(user_input, **numbers)
+
+    async def _predict(self, user_input, model_key):
+        invalid, user_input = self._validate(user_input, model_key)
+        if invalid:
+            return invalid
+
+        # Stat the artifacts first, like cached_predict: a retrained file is reloaded here, and
+        # the reload invalidates cached results even when this request would have been a hit
+        try:
+            registry.preprocessor()
+            registry.scoring_model(model_key)
+        except Exception as e:
+            return 500, {'error': f"Prediction failed: {e}"}
+        if self.cache.generation != registry.reloads:
+            self.cache.clear()
+            self.cache.generation = registry.reloads
+        key = canonical_key(user_input, model_key, registry.reloads)
+        probability = self.cache.get(key)
+
+        if probability is None:
+            # Shed load instead of queueing without bound so latency stays flat
+            if self._in_flight >= self.max_concurrency:
+                return 503, {'error': 'Service busy, retry later'}
+            self._in_flight += 1
+            try:
+                probability = await self.batchers[model_key].submit(user_input)
+            except Exception as e:
+                return 500, {'error': f"Prediction failed: {e}"}
+            finally:
+                self._in_flight -= 1
+            if not math.isfinite(probability):
+                return 500, {'error': 'Prediction failed: the model returned a non-finite probability'}
+            self.cache.put(key, probability)
+        else:
+            drift_monitor.observe(user_input, probability, model_key)
+
+        interpretation, _ = interpret_probability(probability)
+        with metrics.span('advice'):
+            advice = generate_advice(user_input)
+        return 200, {
+            'model': model_key,
+            'probability': probability,
+            'interpretation': interpretation,
+            'advice': advice,
+        }
+
+    async def what_if(self, user_input, model_key='logistic_regression', target=50.0):
+        """
+        Scores the what-if grid of one applicant (see src/models/what_if.py) in a worker thread.
+
+        Returns:
+            tuple: (HTTP status, JSON-serializable payload); the surface is returned as the
+                probabilities of the flattened grid, in the order of the axes (last axis fastest).
+        """
+        invalid, user_input = self._validate(user_input, model_key)
+        if invalid:
+            return invalid
+        if self._in_flight >= self.max_concurrency:
+            return 503, {'error': 'Service busy, retry later'}
+
+        def analyse():
+            model = registry.scoring_model(model_key)
+            scaler = None if getattr(model, 'includes_scaling', False) else registry.scaler()
+            return what_if_analysis(user_input, registry.preprocessor(), model, scaler, target=target)
+
+        self._in_flight += 1
+        try:
+            with metrics.span('what_if_request', model=model_key):
+                result = await asyncio.get_running_loop().run_in_executor(None, analyse)
+        except Exception as e:
+            return 500, {'error': f"What-if analysis failed: {e}"}
+        finally:
+            self._in_flight -= 1
+
+        surface = result.pop('surface')
+        result['probabilities'] = surface['probability'].round(4).tolist()
+        return 200, dict(result, model=model_key)
+
+    def health(self):
+        """
+        Returns liveness information and micro-batching counters.
+        """
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self._started_at, 3) if self._started_at else 0,
+            'in_flight': self._in_flight,
+            'max_concurrency': self.max_concurrency,
+            'batches': {key: {'batches': b.batches, 'requests': b.requests} for key, b in self.batchers.items()},
+            'cache': self.cache.stats(),
+        }
+
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+}
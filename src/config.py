@@ -1,4 +1,13 @@
 MODEL_PATH = 'models/loan_model.pkl'
 SCALER_PATH = 'models/scaler.pkl'
+PREPROCESSOR_PATH = 'models/preprocessor.pkl'
 RAW_PATH = 'data/raw/credit.csv'
 PROCESSED_PATH = 'data/processed/credit_processed.csv'
+PROCESSED_DIR = 'data/processed/credit_processed'
+TIME_TO_FIRST_PREDICTION_TARGET_S = 2.0
+METRICS_PATH = 'metrics/loan_app.prom'
+TRAINING_METRICS_PATH = 'metrics/training.prom'
+ADVICE_RULES_PATH = 'src/assets/advice_rules.json'
+STAGE_CACHE_DIR = 'cache/stages'
+STAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DRIFT_PATH = 'metrics/drift.json'
@@ -0,0 +1,122 @@
+import os
+import json
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+MANIFEST_FILENAME = 'manifest.json'
+
+def _compact(values):
+    """
+    Returns the smallest dtype representation of a numeric column that loses no information.
+    """
+    values = pd.to_numeric(values)
+    if pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype=np.uint8)
+    if pd.api.types.is_integer_dtype(values) or (values.notna().all() and (values % 1 == 0).all()):
+        kind = 'unsigned' if (values >= 0).all() else 'integer'
+        return pd.to_numeric(values.astype(np.int64), downcast=kind).to_numpy()
+    as_float32 = values.to_numpy(dtype=np.float32)
+    if np.array_equal(as_float32.astype(np.float64), values.to_numpy(dtype=np.float64), equal_nan=True):
+        return as_float32
+    return values.to_numpy(dtype=np.float64)
+
+def _column_filename(column):
+    # Column names such as 'Education_Not Graduate' or 'Dependents_3+' are kept readable
+    return column.replace(os.sep, '_') + '.npy'
+
+def save_processed_columnar(df, directory, target_col='Loan_Approved'):
+    """
+    Saves a processed DataFrame as one compact .npy file per column plus a manifest.
+
+    Each column can be memory-mapped on its own; the manifest records the feature
+    order, dtypes, row count and a content hash so consumers can read only the
+    metadata they need. The manifest is written last and atomically.
+
+    Parameters:
+        df (pd.DataFrame): Processed (numeric) DataFrame.
+        directory (str): Output directory.
+        target_col (str): Name of the target column, excluded from the feature order.
+
+    Returns:
+        dict: The written manifest.
+    """
+    try:
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        columns = {}
+        for column in df.columns:
+            values = np.ascontiguousarray(_compact(df[column]))
+            filename = _column_filename(column)
+            np.save(os.path.join(directory, filename), values, allow_pickle=False)
+            digest.update(column.encode())
+            digest.update(values.dtype.str.encode())
+            digest.update(values.tobytes())
+            columns[column] = {'file': filename, 'dtype': values.dtype.str}
+
+        manifest = {
+            'feature_order': [column for column in df.columns if column != target_col],
+            'target': target_col if target_col in df.columns else None,
+            'columns': columns,
+            'row_count': int(len(df)),
+            'content_hash': digest.hexdigest(),
+        }
+
+        # Remove columns left over from a previous, wider dataset
+        keep = {entry['file'] for entry in columns.values()}
+        for filename in os.listdir(directory):
+            if filename.endswith('.npy') and filename not in keep:
+                os.remove(os.path.join(directory, filename))
+
+        manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+        logging.info("Columnar processed data saved to %s (%d rows)", directory, len(df))
+        return manifest
+
+    except Exception as e:
+        logging.error("Failed to save columnar data to %s: %s", directory, e)
+        raise
+
+def read_manifest(directory):
+    """
+    Reads only the manifest of a columnar dataset.
+
+    Returns:
+        dict: Feature order, target, per-column file and dtype, row count and content hash.
+    """
+    with open(os.path.join(directory, MANIFEST_FILENAME)) as f:
+        return json.load(f)
+
+def load_processed_columnar(directory, columns=None, mmap=True):
+    """
+    Loads a columnar dataset written by save_processed_columnar.
+
+    With mmap=True the columns are memory-mapped read-only, so loading costs no
+    parsing and pages are read from disk (or shared from the page cache) on access.
+
+    Parameters:
+        directory (str): Directory holding the manifest and .npy files.
+        columns (list, optional): Subset of columns to load (defaults to all, in order).
+        mmap (bool): Memory-map the column files instead of reading them.
+
+    Returns:
+        pd.DataFrame: The processed data.
+    """
+    try:
+        manifest = read_manifest(directory)
+        columns = columns or list(manifest['columns'])
+        data = {
+            column: np.load(os.path.join(directory, manifest['columns'][column]['file']),
+                            mmap_mode='r' if mmap else None, allow_pickle=False)
+            for column in columns
+        }
+        return pd.DataFrame(data, copy=False)
+
+    except Exception as e:
+        logging.error("Failed to load columnar data from %s: %s", directory, e)
+        raise
@@ -1,24 +1,71 @@
 import pandas as pd
 import logging
 
-logging.basicConfig(filename='loan_app.log', level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+# Reader dtypes of the compact mode: pandas categories for the categorical columns and
+# float32 for the numeric ones (exact for the integer-valued amounts in the data)
+COMPACT_DTYPES = {
+    'Gender': 'category',
+    'Married': 'category',
+    'Dependents': 'category',
+    'Education': 'category',
+    'Self_Employed': 'category',
+    'Property_Area': 'category',
+    'Loan_Approved': 'category',
+    'ApplicantIncome': 'float32',
+    'CoapplicantIncome': 'float32',
+    'LoanAmount': 'float32',
+    'Loan_Amount_Term': 'float32',
+    'Credit_History': 'float32',
+}
 
-def load_data(filepath):
+def _read_csv(filepath, compact, **kwargs):
+    if compact:
+        return pd.read_csv(filepath, dtype=COMPACT_DTYPES, **kwargs)
+    return pd.read_csv(filepath, **kwargs)
+
+def _legacy_casts(df):
+    df['Credit_History'] = df['Credit_History'].astype('object')
+    df['Loan_Amount_Term'] = df['Loan_Amount_Term'].astype('object')
+    return df
+
+def load_data(filepath, compact=False):
     """
     Load dataset from a CSV file.
 
     Parameters:
     filepath (str): Path to the CSV file.
+    compact (bool): Read with COMPACT_DTYPES (category and float32 columns) instead of
+        casting Credit_History and Loan_Amount_Term to object.
 
     Returns:
     pd.DataFrame: Loaded DataFrame, or None if an error occurs.
     """
     try:
-        df = pd.read_csv(filepath)
-        df['Credit_History'] = df['Credit_History'].astype('object')
-        df['Loan_Amount_Term'] = df['Loan_Amount_Term'].astype('object')
+        df = _read_csv(filepath, compact)
+        if not compact:
+            df = _legacy_casts(df)
         logging.info("Data loaded successfully from %s", filepath)
         return df
     except Exception as e:
         logging.error("Failed to load data from %s: %s", filepath, e)
         return None
+
+def iter_data_chunks(filepath, chunksize=100_000, compact=False):
+    """
+    Lazily load a CSV file in chunks, applying the same casts as load_data.
+
+    Parameters:
+    filepath (str): Path to the CSV file.
+    chunksize (int): Number of rows per chunk.
+    compact (bool): Read with COMPACT_DTYPES, as in load_data.
+
+    Yields:
+    pd.DataFrame: The next chunk of rows.
+    """
+    try:
+        for chunk in _read_csv(filepath, compact, chunksize=chunksize):
+            yield chunk if compact else _legacy_casts(chunk)
+        logging.info("Data streamed successfully from %s", filepath)
+    except Exception as e:
+        logging.error("Failed to stream data from %s: %s", filepath, e)
+        raise
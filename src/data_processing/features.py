@@ -1,11 +1,30 @@
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.model_selection import train_test_split
+import numpy as np
 import pandas as pd
 
-def split_and_scale_train_test(df, target_col='Loan_Approved', test_size=0.2, random_state=42):
+def _scale_to_float32(scaler, X, fit, chunk_rows=100_000):
+    """
+    Fits (with partial_fit) and applies a MinMaxScaler chunk by chunk in float64, writing float32.
+
+    Only one chunk is ever held in float64, and the fitted scaler is the same as fit() on all rows.
+    """
+    if fit:
+        for start in range(0, len(X), chunk_rows):
+            scaler.partial_fit(X.iloc[start:start + chunk_rows].astype(np.float64))
+    scaled = np.empty(X.shape, dtype=np.float32)
+    for start in range(0, len(X), chunk_rows):
+        scaled[start:start + chunk_rows] = scaler.transform(X.iloc[start:start + chunk_rows].astype(np.float64))
+    return scaled
+
+def split_and_scale_train_test(df, target_col='Loan_Approved', test_size=0.2, random_state=42, compact=False):
     """
     Splits the data into train and test sets and scales using MinMaxScaler.
 
+    With compact, the scaled train and test frames are stored as float32, halving
+    their size. The scaling itself still runs in float64 (chunk by chunk), so the
+    fitted scaler and the float32 values the models see are the same as without it.
+
     Returns:
         X_train_scaled, X_test_scaled, y_train, y_test, scaler, feature_names
     """
@@ -18,11 +37,34 @@ def split_and_scale_train_test(df, target_col='Loan_Approved', test_size=0.2, ra
     )
 
     scaler = MinMaxScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    if compact:
+        # Compact frames would otherwise be scaled in float32, their common dtype
+        X_train_scaled = _scale_to_float32(scaler, X_train, fit=True)
+        X_test_scaled = _scale_to_float32(scaler, X_test, fit=False)
+    else:
+        # Memory-mapped columnar frames hold uint8/float32 columns; scale them in float64 like the rest
+        X_train_scaled = scaler.fit_transform(X_train.astype(np.float64))
+        X_test_scaled = scaler.transform(X_test.astype(np.float64))
 
     # Convert back to DataFrame to retain feature names
     X_train_scaled = pd.DataFrame(X_train_scaled, columns=feature_names)
     X_test_scaled = pd.DataFrame(X_test_scaled, columns=feature_names)
 
-    return X_train_scaled, X_test_scaled, y_train, y_test, scaler, feature_names
\ No newline at end of file
+    return X_train_scaled, X_test_scaled, y_train, y_test, scaler, feature_names
+
+
+def split_raw_train_test(df_raw, target_col='Loan_Approved', test_size=0.2, random_state=42):
+    """
+    Splits the raw rows the same way split_and_scale_train_test splits the processed ones.
+
+    Preprocessing keeps the row order, so drawing the same stratified split gives
+    the same applicants in each part, unencoded and unscaled, for models that
+    handle categoricals and missing values themselves.
+
+    Returns:
+        X_train, X_test, y_train, y_test (raw feature frames and a 0/1 target)
+    """
+    X = df_raw.drop(columns=[target_col, 'Loan_ID'], errors='ignore')
+    y = df_raw[target_col].map({'Y': 1, 'N': 0}).astype(np.int64)
+
+    return train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
@@ -2,17 +2,169 @@ import pandas as pd
 import logging
 import os
 
+from src.utils.instrumentation import metrics
+
 pd.set_option('future.no_silent_downcasting', True)
 
-logging.basicConfig(filename='loan_app.log', level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+MODE_COLUMNS = ['Gender', 'Married', 'Dependents', 'Self_Employed', 'Loan_Amount_Term', 'Credit_History']
+MEDIAN_COLUMNS = ['LoanAmount']
+NUMERIC_COLUMNS = ['ApplicantIncome', 'CoapplicantIncome', 'LoanAmount', 'Loan_Amount_Term', 'Credit_History']
+CATEGORICAL_COLUMNS = ['Gender', 'Married', 'Dependents', 'Education', 'Self_Employed', 'Property_Area']
+
+
+class Preprocessor:
+    """
+    Fit/transform version of the preprocessing steps.
+
+    Learns the imputation values, the category vocabulary of each one-hot encoded
+    column and the output column order once, so new rows can be transformed
+    without the reference dataset.
+    """
+
+    def __init__(self):
+        self.fill_values_ = None
+        self.categories_ = None
+        self.feature_names_ = None
+        self.value_counts_ = None
+
+    def fit(self, df):
+        """
+        Learn imputation values, category vocabularies and output column order.
+
+        Parameters:
+            df (pd.DataFrame): Raw training DataFrame.
+
+        Returns:
+            Preprocessor: The fitted preprocessor.
+        """
+        self.value_counts_ = None
+        return self.partial_fit(df)
+
+    def partial_fit(self, df):
+        """
+        Update the fitted state with one more chunk of raw rows.
+
+        Only per-value counts are kept, so modes, medians and vocabularies are exact
+        while memory is bounded by the number of distinct values, not rows.
+
+        Parameters:
+            df (pd.DataFrame): Chunk of raw training rows.
+
+        Returns:
+            Preprocessor: The updated preprocessor.
+        """
+        if self.value_counts_ is None:
+            self.value_counts_ = {}
+        for column in dict.fromkeys(MODE_COLUMNS + MEDIAN_COLUMNS + CATEGORICAL_COLUMNS):
+            counts = self.value_counts_.setdefault(column, {})
+            for value, count in df[column].dropna().value_counts(sort=False).items():
+                value = _to_builtin(value)
+                counts[value] = counts.get(value, 0) + int(count)
+
+        fill_values = {}
+        for column in MODE_COLUMNS:
+            fill_values[column] = _mode(self.value_counts_[column])
+        for column in MEDIAN_COLUMNS:
+            fill_values[column] = _median(self.value_counts_[column])
+
+        categories = {}
+        for column in CATEGORICAL_COLUMNS:
+            categories[column] = sorted(str(value) for value in self.value_counts_[column])
+
+        self.fill_values_ = fill_values
+        self.categories_ = categories
+        self.feature_names_ = NUMERIC_COLUMNS + [
+            f"{column}_{category}" for column in CATEGORICAL_COLUMNS for category in categories[column]
+        ]
+        logging.info("Preprocessor fitted with %d output features.", len(self.feature_names_))
+        return self
+
+    def transform(self, df):
+        """
+        Apply the learned imputation and encoding to one or many rows.
+
+        Parameters:
+            df (pd.DataFrame or dict): Raw rows, or a single applicant dict.
+
+        Returns:
+            pd.DataFrame: Numeric features in the fitted column order.
+        """
+        if self.feature_names_ is None:
+            raise ValueError("Preprocessor has not been fitted.")
+        if isinstance(df, dict):
+            df = pd.DataFrame([df])
+
+        with metrics.span('preprocess'):
+            columns = {}
+            for column in NUMERIC_COLUMNS:
+                values = pd.to_numeric(df[column], errors='coerce')
+                if column in self.fill_values_:
+                    values = values.fillna(float(self.fill_values_[column]))
+                columns[column] = values.astype(float).to_numpy()
+
+            for column in CATEGORICAL_COLUMNS:
+                values = df[column]
+                if column in self.fill_values_:
+                    values = values.fillna(self.fill_values_[column])
+                values = values.astype(str)
+                for category in self.categories_[column]:
+                    columns[f"{column}_{category}"] = (values == category).astype(int).to_numpy()
+
+        with metrics.span('reindex'):
+            return pd.DataFrame(columns, index=df.index)[self.feature_names_]
+
+    def fit_transform(self, df):
+        """
+        Fit the preprocessor on the given data and transform it.
+
+        Returns:
+            pd.DataFrame: Numeric features in the fitted column order.
+        """
+        return self.fit(df).transform(df)
+
+
+def _mode(counts):
+    """
+    Most frequent value, ties broken by the smallest value like pd.Series.mode()[0].
+    """
+    if not counts:
+        return None
+    top = max(counts.values())
+    return min(value for value, count in counts.items() if count == top)
+
+def _median(counts):
+    """
+    Exact median of the values described by a value -> count mapping.
+    """
+    if not counts:
+        return None
+    values = sorted(counts)
+    total = sum(counts.values())
+    middle = [(total - 1) // 2, total // 2]
+    found = []
+    seen = 0
+    for value in values:
+        seen += counts[value]
+        while len(found) < 2 and middle[len(found)] < seen:
+            found.append(value)
+    return float(sum(found) / 2)
+
+def _to_builtin(value):
+    """
+    Converts NumPy scalars to plain Python values so the fitted state pickles portably.
+    """
+    return value.item() if hasattr(value, 'item') else value
+
 
-def preprocess_data(df, output_path=None):
+def preprocess_data(df, output_path=None, compact=False):
     """
     Preprocess data by handling missing values and encoding categorical features.
     
     Parameters:
         df (pd.DataFrame): Raw input DataFrame.
         output_path (str, optional): Path to save the processed DataFrame.
+        compact (bool): Keep numeric features as float32, one-hot columns as uint8 and the
+            target as int8 (the values are the same as in the default int64/float64 output).
 
     Returns:
         pd.DataFrame: Preprocessed DataFrame, or None if error occurs.
@@ -21,16 +173,19 @@ def preprocess_data(df, output_path=None):
         df = df.copy()
         df.drop('Loan_ID', axis=1, inplace=True, errors='ignore')
 
-        for column in ['Gender', 'Married', 'Dependents', 'Self_Employed', 'Loan_Amount_Term', 'Credit_History']:
+        for column in MODE_COLUMNS:
             df[column] = df[column].fillna(df[column].mode()[0])
-        df['LoanAmount'] = df['LoanAmount'].fillna(df['LoanAmount'].median())
+        for column in MEDIAN_COLUMNS:
+            df[column] = df[column].fillna(df[column].median())
 
 
-        df = pd.get_dummies(df, columns=[
-            'Gender', 'Married', 'Dependents', 'Education', 'Self_Employed', 'Property_Area'
-        ], dtype=int)
+        df = pd.get_dummies(df, columns=CATEGORICAL_COLUMNS, dtype='uint8' if compact else int)
 
-        if 'Loan_Approved' in df:
+        if compact:
+            df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].astype('float32')
+            if 'Loan_Approved' in df:
+                df['Loan_Approved'] = df['Loan_Approved'].map({'Y': 1, 'N': 0}).astype('int8')
+        elif 'Loan_Approved' in df:
             df['Loan_Approved'] = df['Loan_Approved'].replace({'Y': 1, 'N': 0}).infer_objects(copy=False)
 
         if output_path:
@@ -0,0 +1,60 @@
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+# Continuous columns get multiplicative noise so scaled-up data is not just repeated rows
+NOISY_COLUMNS = ['ApplicantIncome', 'CoapplicantIncome', 'LoanAmount']
+
+def generate_synthetic(reference_df, n_rows, random_state=42, noise=0.05, id_offset=0):
+    """
+    Generates synthetic applicants that follow the reference data's distributions.
+
+    Rows are bootstrapped from the reference, so category frequencies, correlations
+    with the target and per-column missing-value rates are preserved in expectation.
+    Non-missing continuous values are jittered by a relative `noise` and rounded like
+    the original; Loan_ID is regenerated to stay unique.
+
+    Parameters:
+        reference_df (pd.DataFrame): Raw data as loaded from data/raw/credit.csv.
+        n_rows (int): Number of rows to generate.
+        random_state (int): Seed for reproducible data.
+        noise (float): Relative standard deviation of the jitter on continuous columns.
+        id_offset (int): First number used for generated Loan_IDs.
+
+    Returns:
+        pd.DataFrame: Synthetic raw applicants with the reference columns.
+    """
+    rng = np.random.default_rng(random_state)
+    df = reference_df.iloc[rng.integers(0, len(reference_df), n_rows)].reset_index(drop=True)
+
+    for column in NOISY_COLUMNS:
+        if column in df:
+            values = df[column].to_numpy(dtype=float)
+            jitter = rng.normal(1.0, noise, n_rows).clip(0.5, 1.5)
+            df[column] = np.where(np.isnan(values), np.nan, np.round(values * jitter))
+
+    if 'Loan_ID' in df:
+        df['Loan_ID'] = [f"SY{id_offset + i:09d}" for i in range(n_rows)]
+    return df
+
+def write_synthetic_csv(reference_df, output_path, n_rows, chunk_size=500_000, random_state=42):
+    """
+    Writes n_rows synthetic applicants to a CSV file chunk by chunk, so any size fits in memory.
+
+    Returns:
+        str: The output path.
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    written = 0
+    while written < n_rows:
+        size = min(chunk_size, n_rows - written)
+        chunk = generate_synthetic(reference_df, size, random_state=random_state + written, id_offset=written)
+        chunk.to_csv(output_path, mode='a' if written else 'w', header=written == 0, index=False)
+        written += size
+    logging.info("Wrote %d synthetic rows to %s", n_rows, output_path)
+    return output_path
@@ -0,0 +1,166 @@
+import os
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pandas as pd
+
+from src.models.prediction import predict_batch
+from src.utils.advice import advice_engine
+from src.utils.drift import drift_monitor
+from src.utils.interpretation import interpret_probabilities
+
+
+ID_COLUMN = 'Loan_ID'
+ADVICE_SEPARATOR = ' | '
+
+# Artifacts loaded once per worker process by _init_worker
+_worker_artifacts = None
+
+def read_chunks(input_path, chunk_size=50_000):
+    """
+    Lazily reads an applicant file in fixed-size chunks.
+
+    Args:
+        input_path (str): Path to a CSV or Parquet file.
+        chunk_size (int): Number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk of raw applicant rows.
+    """
+    if input_path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet input requires pyarrow to be installed.") from e
+        parquet_file = pq.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+def score_chunk(chunk, preprocessor, model, scaler):
+    """
+    Scores one chunk of applicants and attaches interpretation bands, advice codes and advice.
+
+    Returns:
+        pd.DataFrame: Probability, interpretation, advice codes and advice for each row.
+    """
+    probabilities = predict_batch(chunk, preprocessor, model, scaler)
+
+    result = pd.DataFrame({
+        'probability': probabilities,
+        'interpretation': interpret_probabilities(probabilities),
+        'advice_codes': [ADVICE_SEPARATOR.join(codes) for codes in advice_engine.codes(chunk)],
+        'advice': advice_engine.messages(chunk, ADVICE_SEPARATOR),
+    }, index=chunk.index)
+    if ID_COLUMN in chunk:
+        result.insert(0, ID_COLUMN, chunk[ID_COLUMN].to_numpy())
+    return result
+
+def _init_worker(model_path, scaler_path, preprocessor_path):
+    global _worker_artifacts
+    _worker_artifacts = (
+        joblib.load(preprocessor_path),
+        joblib.load(model_path),
+        joblib.load(scaler_path),
+    )
+
+def _score_chunk_in_worker(chunk):
+    preprocessor, model, scaler = _worker_artifacts
+    return score_chunk(chunk, preprocessor, model, scaler)
+
+class _OutputWriter:
+    """
+    Appends scored chunks to a CSV or Parquet file without holding earlier chunks in memory.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._parquet_writer = None
+        self._header_written = False
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, result):
+        if self.output_path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            result.to_csv(self.output_path, mode='a' if self._header_written else 'w',
+                          header=not self._header_written, index=False)
+            self._header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+def score_file(input_path, output_path, model_path, scaler_path, preprocessor_path,
+               chunk_size=50_000, workers=1, model_key=None):
+    """
+    Streams an applicant file through the model and writes the scores to an output file.
+
+    Memory stays bounded by the chunk size: with a process pool at most two chunks
+    per worker are in flight at any time.
+
+    Args:
+        input_path (str): CSV or Parquet file of raw applicants.
+        output_path (str): CSV or Parquet file to write scores to.
+        model_path (str): Path to the trained model.
+        scaler_path (str): Path to the fitted scaler.
+        preprocessor_path (str): Path to the fitted preprocessor.
+        chunk_size (int): Number of rows per chunk.
+        workers (int): Number of worker processes; 1 scores in the current process.
+        model_key (str, optional): When given, every chunk and its scores are recorded by the
+            drift monitor under this model (in this process, also when scoring in workers).
+
+    Returns:
+        int: Number of rows scored.
+    """
+    writer = _OutputWriter(output_path)
+    rows = 0
+
+    def consume(chunk, result):
+        nonlocal rows
+        writer.write(result)
+        rows += len(result)
+        if model_key is not None:
+            drift_monitor.observe_batch(chunk, result['probability'], model_key)
+
+    try:
+        chunks = read_chunks(input_path, chunk_size)
+        if workers <= 1:
+            preprocessor = joblib.load(preprocessor_path)
+            model = joblib.load(model_path)
+            scaler = joblib.load(scaler_path)
+            for chunk in chunks:
+                consume(chunk, score_chunk(chunk, preprocessor, model, scaler))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path, scaler_path, preprocessor_path)) as executor:
+                # Chunks stay referenced until scored so the drift monitor sees them in this process
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, executor.submit(_score_chunk_in_worker, chunk)))
+                    if len(pending) >= 2 * workers:
+                        chunk, future = pending.popleft()
+                        consume(chunk, future.result())
+                while pending:
+                    chunk, future = pending.popleft()
+                    consume(chunk, future.result())
+
+        logging.info("Scored %d rows from %s into %s", rows, input_path, output_path)
+        return rows
+
+    except Exception as e:
+        logging.error("Batch scoring failed for %s: %s", input_path, e)
+        raise
+
+    finally:
+        writer.close()
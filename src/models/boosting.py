@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.pipeline import Pipeline
+
+from src.data_processing.preprocessing import NUMERIC_COLUMNS, CATEGORICAL_COLUMNS
+
+HIST_GRADIENT_BOOSTING_KEY = "hist_gradient_boosting"
+
+
+class NativeFeatures(TransformerMixin, BaseEstimator):
+    """
+    Turns raw applicant rows into the matrix HistGradientBoostingClassifier consumes natively.
+
+    Numeric columns stay numbers and each categorical column becomes the code of its
+    value in the vocabulary learned in fit, flagged as categorical to the model, so no
+    one-hot expansion or scaling is needed. Missing values are left as NaN (the
+    boosting model learns which side of each split they go to) and categories unseen
+    in fit are treated as missing. Encoding with plain dict lookups rather than pandas
+    categoricals keeps the per-call encoder of the model, and most pandas overhead,
+    out of single-row latency.
+    """
+
+    def fit(self, X, y=None):
+        self.categories_ = {
+            column: sorted(str(value) for value in pd.unique(X[column].dropna()))
+            for column in CATEGORICAL_COLUMNS
+        }
+        self.feature_names_ = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS
+        return self
+
+    def transform(self, X):
+        if isinstance(X, dict):
+            X = pd.DataFrame([X])
+        features = np.empty((len(X), len(self.feature_names_)))
+        try:
+            features[:, :len(NUMERIC_COLUMNS)] = X[NUMERIC_COLUMNS].to_numpy(dtype=float, na_value=np.nan)
+        except (TypeError, ValueError):
+            # Non-numeric strings count as missing, like in the Preprocessor
+            for i, column in enumerate(NUMERIC_COLUMNS):
+                features[:, i] = pd.to_numeric(X[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+        raw = X[CATEGORICAL_COLUMNS].to_numpy(dtype=object)
+        for i, column in enumerate(CATEGORICAL_COLUMNS):
+            codes = {category: float(code) for code, category in enumerate(self.categories_[column])}
+            # Missing values become 'nan' or 'None', which are not categories either
+            features[:, len(NUMERIC_COLUMNS) + i] = [
+                codes.get(value if value.__class__ is str else str(value), np.nan) for value in raw[:, i]
+            ]
+        return features
+
+
+class NativeCategoricalPipeline(Pipeline):
+    """
+    Pipeline of NativeFeatures and a model, scored directly on raw applicant rows.
+
+    prediction.py checks takes_raw_input and skips the one-hot preprocessor and the
+    scaler for it (includes_scaling keeps the scaler from being loaded at all).
+    """
+
+    takes_raw_input = True
+    includes_scaling = True
+
+    def native_features(self, X):
+        """
+        Raw rows encoded for the model (the pipeline's first step).
+        """
+        return self.steps[0][1].transform(X)
+
+    def predict_proba_features(self, features):
+        """
+        Class probabilities for rows already encoded with native_features.
+        """
+        return self.steps[-1][1].predict_proba(features)
+
+
+def build_hist_gradient_boosting(random_state=42, **params):
+    """
+    Returns an unfitted native-categorical histogram gradient boosting pipeline.
+
+    Args:
+        random_state (int): Seed of the boosting model (used for its early-stopping split).
+        **params: Extra HistGradientBoostingClassifier hyperparameters.
+
+    Returns:
+        NativeCategoricalPipeline
+    """
+    return NativeCategoricalPipeline([
+        ("features", NativeFeatures()),
+        ("model", HistGradientBoostingClassifier(
+            categorical_features=[column in CATEGORICAL_COLUMNS for column in NUMERIC_COLUMNS + CATEGORICAL_COLUMNS],
+            random_state=random_state, **params)),
+    ])
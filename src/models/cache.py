@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.data_processing.preprocessing import NUMERIC_COLUMNS
+from src.models.prediction import predict
+from src.models.registry import registry
+from src.utils.drift import drift_monitor
+
+class PredictionCache:
+    """
+    Bounded LRU cache with a time-to-live for prediction results.
+
+    Entries older than ttl_seconds are treated as misses; once max_size entries
+    are stored the least recently used one is evicted.
+    """
+
+    def __init__(self, max_size=4096, ttl_seconds=3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.generation = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Stores value under key, evicting the least recently used entry if full.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every cached entry; counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns hit/miss counters for monitoring.
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, expirations and current size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'size': len(self._entries),
+        }
+
+def canonical_key(user_input, *identity):
+    """
+    Hashes an applicant dict so equivalent inputs share a cache key.
+
+    Numeric fields are compared by value ('360', 360 and 360.0 are equal), as the
+    preprocessor coerces them; every other field is compared as a string.
+
+    Args:
+        user_input (dict): Applicant form input.
+        *identity: Extra values the result depends on (model key, artifact version).
+
+    Returns:
+        str: Hex digest identifying the input and identity.
+    """
+    canonical = {}
+    for field, value in user_input.items():
+        if value is None:
+            canonical[field] = None
+        elif field in NUMERIC_COLUMNS:
+            number = pd.to_numeric(value, errors='coerce')
+            canonical[field] = None if pd.isna(number) else float(number)
+        else:
+            canonical[field] = str(value)
+    payload = json.dumps([canonical, [str(part) for part in identity]], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# Shared by every session running in this process
+prediction_cache = PredictionCache()
+
+def cached_predict(user_input, model_key, cache=prediction_cache, artifacts=registry, scorer=predict):
+    """
+    predict() (or predict_all() for the ensemble, via scorer) with a result cache in front of it.
+
+    Artifacts come from the registry; whenever it reloads a changed file the cache
+    is cleared, so a retrained model never serves stale results. Cached results are
+    recorded by the drift monitor too, so it sees every request.
+
+    Returns:
+        tuple: (probability on a 0-100 scale, preprocessed user input), plus the per-model
+            probabilities with predict_all
+    """
+    preprocessor = artifacts.preprocessor()
+    model = artifacts.scoring_model(model_key)
+    # Compiled models carry their scaling, so the sklearn scaler is never unpickled for them
+    scaler = None if getattr(model, 'includes_scaling', False) else artifacts.scaler()
+
+    if cache.generation != artifacts.reloads:
+        cache.clear()
+        cache.generation = artifacts.reloads
+
+    key = canonical_key(user_input, model_key, artifacts.reloads, scorer.__name__)
+    result = cache.get(key)
+    if result is None:
+        result = scorer(user_input, preprocessor, model, scaler, model_key=model_key)
+        cache.put(key, result)
+    else:
+        drift_monitor.observe(user_input, result[0], model_key)
+    return result
@@ -0,0 +1,218 @@
+import time
+import pickle
+import logging
+
+import numpy as np
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from src.models.compiled import CompiledRandomForest, compile_random_forest
+
+COMPACT_MODEL_KEY = "random_forest_compact"
+TREE_COUNTS = (100, 50, 25, 10)
+DEPTH_LIMITS = (None, 12, 8, 6, 4)
+
+def _float32_thresholds(threshold):
+    """
+    Casts split thresholds to float32 without changing any decision.
+
+    Inputs are compared as float32 (like sklearn); rounding each threshold down to the
+    largest float32 not above it keeps `x <= threshold` identical for every float32 x.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    rounded = threshold.astype(np.float32)
+    return np.where(rounded.astype(np.float64) > threshold, np.nextafter(rounded, np.float32(-np.inf)), rounded)
+
+def compact_forest_arrays(arrays, n_trees=None, max_depth=None):
+    """
+    Keeps the first n_trees trees, cuts them at max_depth and stores the nodes in compact dtypes.
+
+    Nodes at the depth limit become leaves predicting their own class frequency
+    (every node of the compiled forest carries one). Unreachable nodes are dropped
+    and the rest renumbered in their original order.
+
+    Args:
+        arrays (dict): Output of compile_random_forest.
+        n_trees (int, optional): Number of trees to keep (all when None).
+        max_depth (int, optional): Depth limit (unlimited when None).
+
+    Returns:
+        dict: Arrays for CompiledRandomForest, with float32 thresholds and values.
+    """
+    left, right = arrays['left'], arrays['right']
+    roots = np.asarray(arrays['roots'])[:n_trees]
+
+    # Walk the trees level by level from the roots, collecting reachable nodes
+    kept, cut = [roots], []
+    frontier, depth = roots, 0
+    while frontier.size:
+        internal = frontier[left[frontier] != -1]
+        if max_depth is not None and depth >= max_depth:
+            cut.append(internal)
+            break
+        frontier = np.concatenate([left[internal], right[internal]])
+        kept.append(frontier)
+        depth += 1
+
+    nodes = np.sort(np.concatenate(kept))
+    new_index = np.full(left.size, -1, dtype=np.int64)
+    new_index[nodes] = np.arange(nodes.size)
+    is_leaf = left[nodes] == -1
+    if cut:
+        is_leaf[new_index[np.concatenate(cut)]] = True
+
+    return {
+        'kind': np.array('random_forest'),
+        'feature': np.where(is_leaf, 0, arrays['feature'][nodes]).astype(np.int16),
+        'threshold': _float32_thresholds(arrays['threshold'][nodes]),
+        'left': np.where(is_leaf, -1, new_index[left[nodes]]).astype(np.int32),
+        'right': np.where(is_leaf, -1, new_index[right[nodes]]).astype(np.int32),
+        'value': np.asarray(arrays['value'][nodes], dtype=np.float32),
+        'roots': new_index[roots].astype(np.int32),
+        'max_depth': np.array(depth if max_depth is None else min(depth, max_depth)),
+        'scale': arrays['scale'],
+        'offset': arrays['offset'],
+        'feature_names': arrays['feature_names'],
+    }
+
+def _scaled_input_model(arrays):
+    # The compaction is measured on already-scaled test features, so skip the folded-in scaling
+    fields = {key: value for key, value in arrays.items() if key not in ('kind', 'feature_names', 'scale', 'offset')}
+    width = arrays['scale'].size
+    return CompiledRandomForest(scale=np.ones(width), offset=np.zeros(width),
+                                feature_names=list(arrays['feature_names']), **fields)
+
+def _single_row_latency_ms(predict_proba, row, repeats):
+    predict_proba(row)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict_proba(row)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples) * 1000)
+
+def _out_of_bag_rows(model, n_rows, max_rows, random_state=42):
+    """
+    Training rows used for selection and, per row and tree, whether the tree left it out of its bootstrap.
+    """
+    rows = np.arange(n_rows)
+    if n_rows > max_rows:
+        rows = np.sort(np.random.RandomState(random_state).choice(n_rows, max_rows, replace=False))
+    out_of_bag = np.ones((n_rows, len(model.estimators_)), dtype=bool)
+    for tree, samples in enumerate(model.estimators_samples_):
+        out_of_bag[samples, tree] = False
+    return rows, out_of_bag[rows]
+
+def _out_of_bag_scores(tree_values, out_of_bag, y):
+    """
+    Accuracy and ROC AUC of the out-of-bag probabilities (each row averaged over the trees that never saw it).
+    """
+    n_trees = tree_values.shape[1]
+    mask = out_of_bag[:, :n_trees]
+    counts = mask.sum(axis=1)
+    scored = counts > 0
+    probabilities = (tree_values * mask).sum(axis=1)[scored] / counts[scored]
+    return (float(accuracy_score(y[scored], (probabilities >= 0.5).astype(int))),
+            float(roc_auc_score(y[scored], probabilities)))
+
+def compact_random_forest(model, scaler, X_train, y_train, X_test, y_test, tree_counts=TREE_COUNTS,
+                          depth_limits=DEPTH_LIMITS, tolerance=0.01, latency_repeats=200, max_selection_rows=20_000):
+    """
+    Compacts a trained random forest and reports every compaction level.
+
+    Each level (tree count x depth limit) is scored out of bag on the training split:
+    every training row is predicted only by the trees whose bootstrap left it out,
+    so the held-out test split plays no part in the choice. The selected level is
+    the one with the fewest nodes whose out-of-bag accuracy and ROC AUC are both
+    within `tolerance` of the full forest's; the full forest itself is always a
+    level, so one is always selected. The reported accuracy and ROC AUC of every
+    level come from X_test, unbiased by the selection. The report lists node count,
+    array bytes (the memory-mapped footprint), single-row and batch latency, and the
+    selection and test scores per level, next to the pickled sklearn forest. Forests
+    trained without bootstrap have no out-of-bag rows and are selected on X_test,
+    which the report flags as optimistic.
+
+    Args:
+        model: Trained RandomForestClassifier.
+        scaler: Fitted MinMaxScaler the forest was trained behind.
+        X_train (pd.DataFrame): Scaled features the forest was trained on.
+        y_train (pd.Series): Training labels.
+        X_test (pd.DataFrame): Scaled held-out features.
+        y_test (pd.Series): Held-out labels.
+        tree_counts (tuple): Numbers of trees to try besides the full forest.
+        depth_limits (tuple): Depth limits to try (None for unlimited).
+        tolerance (float): Accuracy and ROC AUC the compact forest may lose against the full forest.
+        latency_repeats (int): Timed single-row predictions per level.
+        max_selection_rows (int): Training rows sampled for the out-of-bag scores.
+
+    Returns:
+        tuple: (arrays of the selected level for export, report dict, selected level's
+            held-out probabilities)
+    """
+    X = np.asarray(X_test, dtype=np.float64)
+    y = np.asarray(y_test)
+    compiled_forest = compile_random_forest(model, scaler)
+    n_full = len(model.estimators_)
+
+    if getattr(model, 'bootstrap', False):
+        rows, out_of_bag = _out_of_bag_rows(model, len(X_train), max_selection_rows)
+        X_selection = np.asarray(X_train, dtype=np.float64)[rows]
+        y_selection = np.asarray(y_train)[rows]
+        selection = 'out_of_bag'
+    else:
+        X_selection, y_selection, out_of_bag = X, y, None
+        selection = 'test_split (optimistic: the selected level is also scored on it)'
+
+    report = {
+        'sklearn': {
+            'n_trees': n_full,
+            'node_count': int(sum(estimator.tree_.node_count for estimator in model.estimators_)),
+            'pickle_bytes': len(pickle.dumps(model)),
+            'accuracy': float(accuracy_score(y, model.predict(X_test))),
+            'roc_auc': float(roc_auc_score(y, model.predict_proba(X_test)[:, 1])),
+            'single_row_latency_ms': _single_row_latency_ms(model.predict_proba, X_test.iloc[:1], latency_repeats // 4),
+        },
+        'selection': selection,
+        'tolerance': tolerance,
+        'levels': [],
+    }
+
+    # The full forest comes first: it is the reference every compacted level is compared with
+    levels = [(n_full, None)] + [(n_trees, max_depth) for n_trees in tree_counts for max_depth in depth_limits
+                                 if n_trees < n_full or (n_trees == n_full and max_depth is not None)]
+    candidates = []
+    for n_trees, max_depth in levels:
+        arrays = compact_forest_arrays(compiled_forest, n_trees, max_depth)
+        evaluator = _scaled_input_model(arrays)
+        start = time.perf_counter()
+        probabilities = evaluator.predict_proba(X)[:, 1]
+        batch_seconds = time.perf_counter() - start
+        if out_of_bag is None:
+            selection_scores = (float(accuracy_score(y, (probabilities >= 0.5).astype(int))),
+                                float(roc_auc_score(y, probabilities)))
+        else:
+            selection_scores = _out_of_bag_scores(evaluator.tree_values(X_selection), out_of_bag, y_selection)
+        level = {
+            'n_trees': n_trees,
+            'max_depth': max_depth,
+            'node_count': int(arrays['left'].size),
+            'array_bytes': int(sum(value.nbytes for value in arrays.values() if isinstance(value, np.ndarray))),
+            'selection_accuracy': selection_scores[0],
+            'selection_roc_auc': selection_scores[1],
+            'accuracy': float(accuracy_score(y, (probabilities >= 0.5).astype(int))),
+            'roc_auc': float(roc_auc_score(y, probabilities)),
+            'single_row_latency_ms': _single_row_latency_ms(evaluator.predict_proba, X[:1], latency_repeats),
+            'batch_us_per_row': batch_seconds / len(X) * 1e6,
+        }
+        report['levels'].append(level)
+        candidates.append((level, arrays, probabilities))
+
+    reference = candidates[0][0]
+    eligible = [candidate for candidate in candidates
+                if candidate[0]['selection_accuracy'] >= reference['selection_accuracy'] - tolerance
+                and candidate[0]['selection_roc_auc'] >= reference['selection_roc_auc'] - tolerance]
+    selected, arrays, probabilities = min(eligible, key=lambda candidate: candidate[0]['node_count'])
+    report['selected'] = selected
+    logging.info("Compacted random forest to %d trees, depth %s: %d nodes, %s accuracy %.3f, test accuracy %.3f",
+                 selected['n_trees'], selected['max_depth'], selected['node_count'], selection,
+                 selected['selection_accuracy'], selected['accuracy'])
+    return arrays, report, probabilities
@@ -0,0 +1,213 @@
+import os
+import json
+import logging
+
+import numpy as np
+
+
+COMPILED_SUFFIX = "_compiled"
+
+class CompiledLogisticRegression:
+    """
+    Logistic regression reduced to a coefficient vector with the MinMax scaling folded in.
+
+    Takes unscaled (preprocessed) features: sigmoid(X @ coef + intercept).
+    """
+
+    includes_scaling = True
+
+    def __init__(self, coef, intercept, feature_names):
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.feature_names = feature_names
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        positive = 1.0 / (1.0 + np.exp(-(X @ self.coef + self.intercept)))
+        return np.column_stack([1.0 - positive, positive])
+
+class CompiledRandomForest:
+    """
+    Random forest flattened into contiguous node arrays and evaluated level by level with NumPy.
+
+    All trees share one set of arrays; children are global node indices and leaves
+    have left == -1. Inputs are scaled with the stored MinMax parameters first,
+    since the split thresholds live in scaled space.
+    """
+
+    includes_scaling = True
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth,
+                 scale, offset, feature_names):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.scale = scale
+        self.offset = offset
+        self.feature_names = feature_names
+
+    def tree_values(self, X):
+        """
+        Returns the positive-class frequency of the leaf each row reaches in each tree (rows x trees).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        # sklearn trees compare float32 inputs against their thresholds
+        X = (X * self.scale + self.offset).astype(np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.size)).copy()
+
+        for _ in range(self.max_depth):
+            left = self.left[nodes]
+            is_leaf = left == -1
+            if is_leaf.all():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(is_leaf, nodes, np.where(go_left, left, self.right[nodes]))
+
+        return self.value[nodes]
+
+    def predict_proba(self, X):
+        positive = self.tree_values(X).mean(axis=1, dtype=np.float64)
+        return np.column_stack([1.0 - positive, positive])
+
+def compile_logistic_regression(model, scaler):
+    """
+    Folds the MinMax scaler into the logistic regression coefficients.
+
+    Returns:
+        dict: Arrays for CompiledLogisticRegression.
+    """
+    weights = model.coef_[0]
+    return {
+        'kind': np.array('logistic_regression'),
+        'coef': weights * scaler.scale_,
+        'intercept': np.array(model.intercept_[0] + weights @ scaler.min_),
+        'feature_names': np.array(scaler.feature_names_in_, dtype=str),
+    }
+
+def compile_random_forest(model, scaler):
+    """
+    Flattens every tree of the forest into shared node arrays.
+
+    Returns:
+        dict: Arrays for CompiledRandomForest.
+    """
+    positive_index = list(model.classes_).index(1)
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        counts = tree.value[:, 0, :]
+        is_leaf = tree.children_left == -1
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+        rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+        values.append(counts[:, positive_index] / counts.sum(axis=1))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        'kind': np.array('random_forest'),
+        'feature': np.concatenate(features).astype(np.int32),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'left': np.concatenate(lefts).astype(np.int32),
+        'right': np.concatenate(rights).astype(np.int32),
+        'value': np.concatenate(values).astype(np.float64),
+        'roots': np.array(roots, dtype=np.int32),
+        'max_depth': np.array(max_depth),
+        'scale': scaler.scale_.astype(np.float64),
+        'offset': scaler.min_.astype(np.float64),
+        'feature_names': np.array(scaler.feature_names_in_, dtype=str),
+    }
+
+_COMPILERS = {
+    'LogisticRegression': compile_logistic_regression,
+    'RandomForestClassifier': compile_random_forest,
+}
+
+def save_compiled_arrays(arrays, compiled_path):
+    """
+    Writes one compiled model as a directory of .npy arrays plus meta.json (written last).
+
+    Args:
+        arrays (dict): Output of a compile_* function (or of compaction.compact_forest_arrays).
+        compiled_path (str): Target directory, conventionally <name>_compiled.
+    """
+    arrays = dict(arrays)
+    meta = {
+        'kind': str(arrays.pop('kind')),
+        'feature_names': np.asarray(arrays.pop('feature_names')).tolist(),
+        'scalars': {key: arrays.pop(key).item() for key in list(arrays) if np.ndim(arrays[key]) == 0},
+        'arrays': sorted(arrays),
+    }
+    os.makedirs(compiled_path, exist_ok=True)
+    for key, values in arrays.items():
+        np.save(os.path.join(compiled_path, f"{key}.npy"), np.ascontiguousarray(values), allow_pickle=False)
+    with open(os.path.join(compiled_path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+def export_compiled_models(models: dict, scaler, base_path):
+    """
+    Writes a NumPy-only version of each supported model next to its pickle.
+
+    Each compiled model is a directory of .npy arrays plus a meta.json, so the
+    arrays can be memory-mapped and shared between processes through the page cache.
+
+    Args:
+        models (dict): Dictionary of model name to model object.
+        scaler: Fitted scaler used for input features.
+        base_path (str): Directory the models were saved to.
+    """
+    try:
+        os.makedirs(base_path, exist_ok=True)
+        for name, model in models.items():
+            compiler = _COMPILERS.get(type(model).__name__)
+            if compiler is None:
+                continue
+            compiled_path = os.path.join(base_path, f"{name}{COMPILED_SUFFIX}")
+            save_compiled_arrays(compiler(model, scaler), compiled_path)
+            logging.info(f"Compiled model '{name}' saved to {compiled_path}")
+
+    except Exception as e:
+        logging.error(f"Failed to export compiled models: {e}")
+        raise
+
+def load_compiled_model(compiled_path, mmap=True):
+    """
+    Loads a compiled model without importing scikit-learn.
+
+    Args:
+        compiled_path (str): Directory written by export_compiled_models.
+        mmap (bool): Memory-map the arrays read-only instead of reading them into private memory.
+
+    Returns:
+        CompiledLogisticRegression or CompiledRandomForest
+    """
+    try:
+        with open(os.path.join(compiled_path, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {
+            key: np.load(os.path.join(compiled_path, f"{key}.npy"), mmap_mode='r' if mmap else None,
+                         allow_pickle=False)
+            for key in meta['arrays']
+        }
+        arrays.update(meta['scalars'])
+        kind = meta['kind']
+        if kind == 'logistic_regression':
+            model = CompiledLogisticRegression(arrays['coef'], arrays['intercept'], meta['feature_names'])
+        elif kind == 'random_forest':
+            model = CompiledRandomForest(feature_names=meta['feature_names'], **arrays)
+        else:
+            raise ValueError(f"Unknown compiled model kind '{kind}'")
+        logging.info(f"Compiled model loaded from {compiled_path}")
+        return model
+    except Exception as e:
+        logging.error(f"Failed to load compiled model from {compiled_path}: {e}")
+        raise
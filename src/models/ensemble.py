@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+ENSEMBLE_KEY = "ensemble"
+ENSEMBLE_FILENAME = "ensemble.json"
+# The compact forest is a cut-down copy of the random forest, so it is not a member of its own;
+# gradient boosting scores raw rows, not the shared preprocessed matrix, so it is not one either
+ENSEMBLE_MEMBERS = ("logistic_regression", "random_forest")
+
+def ensemble_weights(model_metrics, metric="roc_auc"):
+    """
+    Weights each model by how far its held-out metric is above chance.
+
+    Args:
+        model_metrics (dict): Model key to its metrics entry (as saved in <model>_metrics.json).
+        metric (str): Metric to weight by; ROC AUC by default, so 0.5 counts as no skill.
+
+    Returns:
+        dict: Model key to weight, summing to 1 (equal weights when no model beats chance).
+    """
+    baseline = 0.5 if metric == "roc_auc" else 0.0
+    skill = {key: max(float(entry[metric]) - baseline, 0.0) for key, entry in model_metrics.items()}
+    total = sum(skill.values())
+    if total == 0:
+        return {key: 1 / len(skill) for key in skill}
+    return {key: value / total for key, value in skill.items()}
+
+class EnsembleModel:
+    """
+    Weighted average of several models' approval probabilities over one shared input matrix.
+
+    Takes unscaled (preprocessed) features like the compiled models. The features
+    are scaled at most once per call, and only when a member needs scaled input,
+    so each member adds only its own predict_proba to the cost of a prediction.
+    """
+
+    includes_scaling = True
+
+    def __init__(self, members, weights, scaler=None):
+        self.members = members
+        self.weights = weights
+        self.scaler = scaler
+
+    def predict_proba_members(self, X):
+        """
+        Returns each member's approval probability (0-1) for every row.
+
+        Returns:
+            dict: Model key to an array of positive-class probabilities.
+        """
+        scaled = None
+        probabilities = {}
+        for key, model in self.members.items():
+            if getattr(model, 'includes_scaling', False):
+                probabilities[key] = model.predict_proba(X)[:, 1]
+            else:
+                if scaled is None:
+                    # The scaler was fitted with feature names; keep them to match
+                    scaled = self.scaler.transform(pd.DataFrame(X, columns=self.scaler.feature_names_in_))
+                probabilities[key] = model.predict_proba(scaled)[:, 1]
+        return probabilities
+
+    def combine(self, probabilities):
+        """
+        Weighted average of per-member probabilities.
+        """
+        return sum(self.weights[key] * np.asarray(values) for key, values in probabilities.items())
+
+    def predict_proba(self, X):
+        positive = self.combine(self.predict_proba_members(X))
+        return np.column_stack([1.0 - positive, positive])
@@ -1,16 +1,25 @@
-from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
-from sklearn.model_selection import cross_val_score, KFold
+from sklearn.metrics import (accuracy_score, confusion_matrix, classification_report, precision_score,
+                             recall_score, f1_score, roc_auc_score, log_loss)
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import MinMaxScaler
+from sklearn.pipeline import make_pipeline
+from sklearn.base import clone
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import logging
+import time
 
-logging.basicConfig(filename='loan_app.log', level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
-def evaluate_model(model, X_test, y_test, threshold=0.5):
+def evaluate_model(model, X_test, y_test, threshold=0.5, analysis=False):
     """
     Evaluate the given model's accuracy, confusion matrix, and classification report.
 
+    With analysis=True the same single predict_proba pass also yields the full
+    threshold analysis (see threshold_analysis), returned as a fourth element.
+
     Returns:
-    tuple: accuracy, confusion matrix, classification report.
+    tuple: accuracy, confusion matrix, classification report (and the analysis dict).
     """
     try:
         prob_pred = model.predict_proba(X_test)[:, 1]
@@ -19,10 +28,91 @@ def evaluate_model(model, X_test, y_test, threshold=0.5):
         conf_mat = confusion_matrix(y_test, y_pred)
         report = classification_report(y_test, y_pred)
         logging.info("Model evaluation completed successfully with accuracy: %.2f", acc)
+        if analysis:
+            return acc, conf_mat, report, threshold_analysis(y_test, prob_pred)
         return acc, conf_mat, report
     except Exception as e:
         logging.error("Error evaluating model: %s", e)
-        return 0, None, None
+        return (0, None, None, None) if analysis else (0, None, None)
+
+def threshold_analysis(y_true, prob_pred, n_bins=10, objective='accuracy'):
+    """
+    Computes ROC and precision-recall curves, the confusion matrix at every threshold
+    and calibration bins from one array of scores.
+
+    Scores are sorted once; true and false positives at every distinct threshold
+    are cumulative sums over the sorted labels, so no threshold is re-scored.
+    A row is predicted positive when its score is >= the threshold, as in evaluate_model.
+
+    Args:
+        y_true (array-like): Binary labels.
+        prob_pred (array-like): Positive-class probabilities (0-1).
+        n_bins (int): Number of equal-width calibration bins.
+        objective (str): 'accuracy', 'f1' or 'youden' - the metric the operating point maximizes.
+
+    Returns:
+        dict: 'curves' (per-threshold arrays), 'roc_auc', 'average_precision',
+            'operating_point' and 'calibration'.
+    """
+    y_true = np.asarray(y_true, dtype=int)
+    prob_pred = np.asarray(prob_pred, dtype=float)
+    order = np.argsort(-prob_pred, kind='mergesort')
+    scores, labels = prob_pred[order], y_true[order]
+
+    # Last index of each run of equal scores: every row up to it is predicted positive
+    last = np.r_[np.flatnonzero(np.diff(scores)), scores.size - 1]
+    tp = np.r_[0, np.cumsum(labels)[last]]
+    fp = np.r_[0, last + 1 - tp[1:]]
+    thresholds = np.r_[np.inf, scores[last]]
+
+    positives, negatives = int(labels.sum()), int(labels.size - labels.sum())
+    fn, tn = positives - tp, negatives - fp
+    tpr = tp / max(positives, 1)
+    fpr = fp / max(negatives, 1)
+    predicted = tp + fp
+    precision = np.divide(tp, predicted, out=np.ones(tp.size), where=predicted > 0)
+    accuracy = (tp + tn) / labels.size
+    f1 = np.divide(2 * tp, 2 * tp + fp + fn, out=np.zeros(tp.size), where=(2 * tp + fp + fn) > 0)
+
+    objectives = {'accuracy': accuracy, 'f1': f1, 'youden': tpr - fpr}
+    if objective not in objectives:
+        raise ValueError(f"Unknown objective '{objective}'")
+    target = objectives[objective]
+    # Among equally good thresholds take the one closest to 0.5
+    candidates = np.flatnonzero(np.isclose(target, target.max()))
+    best = candidates[np.argmin(np.abs(np.nan_to_num(thresholds[candidates], posinf=2.0) - 0.5))]
+
+    # Equal-width calibration bins: mean predicted probability vs observed approval rate
+    bins = np.minimum((prob_pred * n_bins).astype(int), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    predicted_sum = np.bincount(bins, weights=prob_pred, minlength=n_bins)
+    observed_sum = np.bincount(bins, weights=y_true, minlength=n_bins)
+
+    return {
+        'curves': {
+            'thresholds': np.nan_to_num(thresholds, posinf=1.0 + 1e-9).tolist(),
+            'tp': tp.tolist(), 'fp': fp.tolist(), 'tn': tn.tolist(), 'fn': fn.tolist(),
+            'tpr': tpr.tolist(), 'fpr': fpr.tolist(), 'precision': precision.tolist(),
+            'accuracy': accuracy.tolist(), 'f1': f1.tolist(),
+        },
+        'roc_auc': float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)),
+        'average_precision': float(np.sum(np.diff(tpr) * precision[1:])),
+        'operating_point': {
+            'objective': objective,
+            'threshold': float(thresholds[best]) if np.isfinite(thresholds[best]) else 1.0,
+            'accuracy': float(accuracy[best]), 'f1': float(f1[best]),
+            'precision': float(precision[best]), 'recall': float(tpr[best]),
+            'false_positive_rate': float(fpr[best]),
+            'confusion_matrix': [[int(tn[best]), int(fp[best])], [int(fn[best]), int(tp[best])]],
+        },
+        'calibration': {
+            'bin_edges': np.linspace(0, 1, n_bins + 1).round(6).tolist(),
+            'count': counts.tolist(),
+            # Empty bins have no rate; None keeps the JSON standard
+            'mean_predicted': [float(v) if n else None for v, n in zip(predicted_sum / np.maximum(counts, 1), counts)],
+            'observed_rate': [float(v) if n else None for v, n in zip(observed_sum / np.maximum(counts, 1), counts)],
+        },
+    }
 
 def feature_importance(model, feature_names):
     """
@@ -42,18 +132,77 @@ def feature_importance(model, feature_names):
         logging.error("Error calculating feature importance: %s", e)
         return None
 
-def cross_validate_model(model, X_train, y_train, n_splits=5):
+def _run_fold(estimator, X, y, train_idx, test_idx, threshold, scale=True):
+    """
+    Fits a fresh scaler and model on one fold and scores it with a single predict_proba pass.
     """
-    Perform cross-validation and return accuracy scores.
+    pipeline = make_pipeline(MinMaxScaler(), clone(estimator)) if scale else clone(estimator)
+
+    start = time.perf_counter()
+    pipeline.fit(X.iloc[train_idx], y.iloc[train_idx])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prob_pred = pipeline.predict_proba(X.iloc[test_idx])[:, 1]
+    score_time = time.perf_counter() - start
+
+    y_true = y.iloc[test_idx]
+    y_pred = (prob_pred >= threshold).astype(int)
+    return {
+        'accuracy': accuracy_score(y_true, y_pred),
+        'precision': precision_score(y_true, y_pred, zero_division=0),
+        'recall': recall_score(y_true, y_pred, zero_division=0),
+        'f1': f1_score(y_true, y_pred, zero_division=0),
+        'roc_auc': roc_auc_score(y_true, prob_pred),
+        'log_loss': log_loss(y_true, prob_pred, labels=[0, 1]),
+        'fit_time': fit_time,
+        'score_time': score_time,
+    }
+
+def cross_validate_model(model, X, y, n_splits=5, n_jobs=None, threshold=0.5, random_state=42, scale=True):
+    """
+    Perform stratified cross-validation with the scaling fitted inside each fold.
+
+    Folds run in parallel in a process pool. Each fold clones the model, fits a
+    MinMaxScaler on its training part only and computes all metrics from one
+    predict_proba pass, recording fit and score time.
+
+    Parameters:
+    model: Model whose hyperparameters are cross-validated (it is cloned, not refitted).
+    X (pd.DataFrame): Unscaled features.
+    y (pd.Series): Target.
+    n_jobs (int, optional): Folds evaluated concurrently (defaults to one per fold).
+    scale (bool): Fit a MinMaxScaler per fold; off for models taking raw rows (X is then raw features).
 
     Returns:
-    dict: Cross-validation results containing mean and standard deviation of accuracy.
+    dict: Per-fold metrics, their mean and standard deviation, plus the accuracy
+    scores, mean_accuracy and std_accuracy keys of the previous version.
     """
     try:
-        kfold = KFold(n_splits=n_splits)
-        scores = cross_val_score(model, X_train, y_train, cv=kfold)
+        folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        splits = list(folds.split(X, y))
+        workers = min(n_jobs or n_splits, n_splits)
+
+        if workers <= 1:
+            fold_metrics = [_run_fold(model, X, y, train_idx, test_idx, threshold, scale)
+                            for train_idx, test_idx in splits]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_run_fold, model, X, y, train_idx, test_idx, threshold, scale)
+                           for train_idx, test_idx in splits]
+                fold_metrics = [future.result() for future in futures]
+
+        folds_df = pd.DataFrame(fold_metrics)
+        scores = folds_df['accuracy'].to_numpy()
         logging.info("Cross-validation completed successfully. Mean accuracy: %.2f", scores.mean())
-        return {'scores': scores, 'mean_accuracy': scores.mean(), 'std_accuracy': scores.std()}
+        return {
+            'folds': fold_metrics,
+            'mean': folds_df.mean().to_dict(),
+            'std': folds_df.std(ddof=0).to_dict(),
+            'scores': scores,
+            'mean_accuracy': scores.mean(),
+            'std_accuracy': scores.std(),
+        }
     except Exception as e:
         logging.error("Error during cross-validation: %s", e)
-        return {'scores': [], 'mean_accuracy': 0, 'std_accuracy': 0}
+        return {'folds': [], 'mean': {}, 'std': {}, 'scores': [], 'mean_accuracy': 0, 'std_accuracy': 0}
@@ -0,0 +1,143 @@
+import os
+import logging
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import MinMaxScaler
+
+from src.data_processing.data_loader import iter_data_chunks
+from src.data_processing.preprocessing import Preprocessor
+
+
+TARGET_COLUMN = 'Loan_Approved'
+CLASSES = np.array([0, 1])
+
+def _split_holdout(chunk, holdout_percent):
+    """
+    Deterministically assigns rows to the held-out stream by hashing Loan_ID (or the row index),
+    so a row lands on the same side on every pass and in every later run.
+    """
+    keys = chunk['Loan_ID'] if 'Loan_ID' in chunk else pd.Series(chunk.index, index=chunk.index)
+    is_holdout = (pd.util.hash_pandas_object(keys, index=False).to_numpy() % 100) < holdout_percent
+    return chunk[~is_holdout], chunk[is_holdout]
+
+def _target(chunk):
+    # map works on both object and category (compact) targets
+    return chunk[TARGET_COLUMN].map({'Y': 1, 'N': 0}).to_numpy(dtype=int)
+
+class IncrementalTrainer:
+    """
+    Trains a logistic model chunk by chunk without loading the full dataset.
+
+    Imputation statistics come from Preprocessor.partial_fit, scaling from
+    MinMaxScaler.partial_fit, and the model is an SGDClassifier with log loss
+    updated with partial_fit. Peak memory is bounded by the chunk size. With
+    compact, chunks are read with category/float32 dtypes (see data_loader.COMPACT_DTYPES).
+    """
+
+    def __init__(self, chunksize=100_000, holdout_percent=20, epochs=5, random_state=42, compact=False):
+        self.chunksize = chunksize
+        self.compact = compact
+        self.holdout_percent = holdout_percent
+        self.epochs = epochs
+        self.preprocessor = Preprocessor()
+        self.scaler = MinMaxScaler()
+        self.model = SGDClassifier(loss='log_loss', alpha=1e-3, average=True, random_state=random_state)
+        self.rows_seen = 0
+
+    def _chunks(self, path):
+        # Trainers saved before the compact mode existed read with the default dtypes
+        return iter_data_chunks(path, self.chunksize, compact=getattr(self, 'compact', False))
+
+    def _train_chunks(self, paths):
+        for path in paths:
+            for chunk in self._chunks(path):
+                train, _ = _split_holdout(chunk, self.holdout_percent)
+                if len(train):
+                    yield train
+
+    def fit(self, paths):
+        """
+        Fits preprocessing, scaling and the model from scratch over the given CSV files.
+
+        Streams the files once for the imputation statistics, once for the scaling
+        range and `epochs` times for the model.
+
+        Returns:
+            IncrementalTrainer: The fitted trainer.
+        """
+        for chunk in self._train_chunks(paths):
+            self.preprocessor.partial_fit(chunk)
+        for chunk in self._train_chunks(paths):
+            self.scaler.partial_fit(self.preprocessor.transform(chunk))
+        for epoch in range(self.epochs):
+            self._update_model(paths, count_rows=epoch == 0)
+        logging.info("Incremental model trained on %d rows.", self.rows_seen)
+        return self
+
+    def update(self, paths):
+        """
+        Continues training on new files (e.g. a new month of data) without starting over.
+
+        The preprocessing vocabulary and scaling range are kept fixed so the model's
+        inputs keep their meaning; only the model weights are updated.
+
+        Returns:
+            IncrementalTrainer: The updated trainer.
+        """
+        for epoch in range(self.epochs):
+            self._update_model(paths, count_rows=epoch == 0)
+        logging.info("Incremental model updated; %d rows seen in total.", self.rows_seen)
+        return self
+
+    def _update_model(self, paths, count_rows):
+        # Rows are counted in the first epoch only, so rows_seen counts distinct training rows
+        for chunk in self._train_chunks(paths):
+            X = self.scaler.transform(self.preprocessor.transform(chunk))
+            self.model.partial_fit(X, _target(chunk), classes=CLASSES)
+            if count_rows:
+                self.rows_seen += len(chunk)
+
+    def evaluate(self, paths, threshold=0.5):
+        """
+        Scores the held-out stream chunk by chunk.
+
+        Returns:
+            dict: Accuracy, log loss and number of held-out rows.
+        """
+        correct = 0
+        total = 0
+        loss = 0.0
+        for path in paths:
+            for chunk in self._chunks(path):
+                _, holdout = _split_holdout(chunk, self.holdout_percent)
+                if not len(holdout):
+                    continue
+                y_true = _target(holdout)
+                X = self.scaler.transform(self.preprocessor.transform(holdout))
+                prob = np.clip(self.model.predict_proba(X)[:, 1], 1e-15, 1 - 1e-15)
+                correct += int(((prob >= threshold).astype(int) == y_true).sum())
+                loss -= float((y_true * np.log(prob) + (1 - y_true) * np.log(1 - prob)).sum())
+                total += len(holdout)
+        return {
+            'accuracy': correct / total if total else 0.0,
+            'log_loss': loss / total if total else 0.0,
+            'holdout_rows': total,
+        }
+
+    def save(self, path):
+        """
+        Saves the trainer (preprocessor, scaler, model and progress) so training can resume later.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        joblib.dump(self, path)
+        logging.info("Incremental trainer saved to %s", path)
+
+    @staticmethod
+    def load(path):
+        """
+        Loads a trainer saved with save().
+        """
+        return joblib.load(path)
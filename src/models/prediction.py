@@ -1,49 +1,126 @@
 import pandas as pd
-from src.data_processing.preprocessing import preprocess_data
 
-def predict(user_input_dict, df_processed, model, scaler, feature_order):
+from src.utils.instrumentation import metrics
+from src.utils.drift import drift_monitor
+
+def _predict_positive(model, scaler, processed):
+    """
+    Returns the approval probability (0-1) for each preprocessed row.
+
+    Compiled models from src/models/compiled.py fold the scaling in and take the
+    unscaled features directly, skipping sklearn's input validation.
+    """
+    model_name = type(model).__name__
+    if getattr(model, 'includes_scaling', False):
+        with metrics.span('predict_proba', model=model_name):
+            return model.predict_proba(processed.to_numpy(dtype=float))[:, 1]
+    with metrics.span('scale'):
+        scaled = scaler.transform(processed)
+    with metrics.span('predict_proba', model=model_name):
+        return model.predict_proba(scaled)[:, 1]
+
+def _score_rows(input_df, preprocessor, model, scaler):
+    """
+    Returns the approval probability (0-1) of each raw row and the features the model saw.
+
+    Models taking raw input (src/models/boosting.py) encode the rows themselves, so
+    the one-hot preprocessor and the scaler are skipped for them.
+    """
+    if getattr(model, 'takes_raw_input', False):
+        with metrics.span('preprocess'):
+            features = model.native_features(input_df)
+        with metrics.span('predict_proba', model=type(model).__name__):
+            return model.predict_proba_features(features)[:, 1], features
+    processed = preprocessor.transform(input_df)
+    return _predict_positive(model, scaler, processed), processed
+
+def predict(user_input_dict, preprocessor, model, scaler, model_key=None):
     """
     Generate a probability prediction and return preprocessed input.
 
     Parameters:
     - user_input_dict (dict): Dictionary of user inputs.
-    - df_processed (pd.DataFrame): Processed dataset (includes all training data).
-    - model: Trained machine learning model.
-    - scaler: Pre-fitted scaler for feature scaling.
-    - feature_order (list): Ordered list of feature names used during training.
+    - preprocessor (Preprocessor): Fitted preprocessor holding imputation values and feature order.
+    - model: Trained machine learning model, or a compiled model from src/models/compiled.py.
+    - scaler: Pre-fitted scaler for feature scaling (unused by compiled and raw-input models).
+    - model_key (str, optional): When given, the input and probability are recorded by the drift monitor under this model.
 
     Returns:
     - float: Probability of loan approval (0-100 scale).
-    - pd.DataFrame: Preprocessed (but not scaled) user input ready for SHAP explanation.
+    - pd.DataFrame: Preprocessed (but not scaled) user input ready for SHAP explanation
+      (the natively encoded input for raw-input models).
     """
     try:
         # Ensure user input is in the correct format
-        input_df = pd.DataFrame([user_input_dict])
+        with metrics.span('build_input'):
+            input_df = pd.DataFrame([user_input_dict])
+
+        # Apply the imputation and encoding learned at training time, then scale and score
+        probabilities, user_processed = _score_rows(input_df, preprocessor, model, scaler)
+        probability = probabilities[0] * 100
+        if model_key is not None:
+            drift_monitor.observe(user_input_dict, probability, model_key)
 
-        # Preprocess the input data
-        reference_df = df_processed.drop('Loan_Approved', axis=1).copy()
-        combined_df = pd.concat([input_df, reference_df], axis=0, ignore_index=True)
+        return probability, user_processed # Return the preprocessed input for SHAP explanation
 
-        # Preprocess the combined data
-        combined_processed = preprocess_data(combined_df)
-        user_processed = combined_processed.iloc[0:1].copy()
+    except Exception as e:
+        raise ValueError(f"Prediction failed: {e}")
 
-        # Remove duplicate columns if any
-        user_processed = user_processed.loc[:, ~user_processed.columns.duplicated()].copy()
-        feature_order = pd.Index(feature_order).drop_duplicates().tolist()
-        user_processed = user_processed.reindex(columns=feature_order, fill_value=0)
+def predict_all(user_input_dict, preprocessor, model, scaler=None, model_key=None):
+    """
+    Score one applicant with every member of an ensemble on one shared input matrix.
 
-        # Fill any remaining missing values
-        user_processed.fillna(0, inplace=True)
-        
-        # Force numeric
-        user_processed = user_processed.apply(pd.to_numeric, errors='coerce')
+    The input is built, preprocessed and (when a member needs it) scaled once; each
+    member then only runs its own predict_proba.
 
-        # Scale the user input using the pre-fitted scaler
-        user_scaled = scaler.transform(user_processed)
-        probability = model.predict_proba(user_scaled)[0][1] * 100
+    Parameters:
+    - user_input_dict (dict): Dictionary of user inputs.
+    - preprocessor (Preprocessor): Fitted preprocessor holding imputation values and feature order.
+    - model (EnsembleModel): Ensemble from src/models/ensemble.py (it scales for its members itself).
+    - scaler: Unused; accepted so predict_all can stand in for predict.
+    - model_key (str, optional): When given, the input and ensemble probability are recorded by the drift monitor under this model.
 
-        return probability, user_processed # Return the preprocessed input for SHAP explanation
+    Returns:
+    - float: Ensemble probability of loan approval (0-100 scale).
+    - pd.DataFrame: Preprocessed (but not scaled) user input ready for SHAP explanation.
+    - dict: Model key to that model's probability of loan approval (0-100 scale).
+    """
+    try:
+        with metrics.span('build_input'):
+            input_df = pd.DataFrame([user_input_dict])
+
+        user_processed = preprocessor.transform(input_df)
+
+        with metrics.span('predict_proba', model=type(model).__name__):
+            members = model.predict_proba_members(user_processed.to_numpy(dtype=float))
+            probability = float(model.combine(members)[0]) * 100
+        if model_key is not None:
+            drift_monitor.observe(user_input_dict, probability, model_key)
+
+        return probability, user_processed, {key: float(values[0]) * 100 for key, values in members.items()}
+
+    except Exception as e:
+        raise ValueError(f"Prediction failed: {e}")
+
+def predict_batch(input_df, preprocessor, model, scaler, model_key=None):
+    """
+    Generate probability predictions for many applicants in one vectorized pass.
+
+    Parameters:
+    - input_df (pd.DataFrame): Raw applicant rows with the same columns as the form input.
+    - preprocessor (Preprocessor): Fitted preprocessor holding imputation values and feature order.
+    - model: Trained machine learning model, or a compiled model from src/models/compiled.py.
+    - scaler: Pre-fitted scaler for feature scaling (unused by compiled and raw-input models).
+    - model_key (str, optional): When given, the rows and probabilities are recorded by the drift monitor under this model.
+
+    Returns:
+    - np.ndarray: Probability of loan approval (0-100 scale) for each row.
+    """
+    try:
+        probabilities = _score_rows(input_df, preprocessor, model, scaler)[0] * 100
+        if model_key is not None:
+            drift_monitor.observe_batch(input_df, probabilities, model_key)
+        return probabilities
 
     except Exception as e:
-        raise ValueError(f"Prediction failed: {e}")
\ No newline at end of file
+        raise ValueError(f"Batch prediction failed: {e}")
@@ -0,0 +1,138 @@
+import os
+import json
+import logging
+import threading
+
+import joblib
+
+from src.models.compiled import COMPILED_SUFFIX, load_compiled_model
+from src.models.ensemble import ENSEMBLE_KEY, ENSEMBLE_FILENAME, EnsembleModel
+from src.models.storage import resolve_artifact_dir
+
+
+class ArtifactRegistry:
+    """
+    Process-wide cache of the artifacts saved under models/.
+
+    Files are read from the current bundle (see storage.save_bundle), or from
+    models/ itself when no bundle was published. Each file is loaded once and
+    shared by every caller in the process. Before returning a cached artifact the
+    file is stat'ed, and it is reloaded only when its path (a new current bundle),
+    modification time or size changed, so retraining is picked up without a
+    restart. Pickles are loaded with memory-mapped arrays.
+    """
+
+    def __init__(self, root='models', loader=None):
+        self.root = root
+        self._loader = loader or (lambda path: joblib.load(path, mmap_mode='r'))
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.loads = 0
+        self.reloads = 0
+
+    def get(self, filename, loader=None):
+        """
+        Returns the artifact stored in base_path/filename, loading it if needed.
+
+        Args:
+            filename (str): File name relative to the registry's base path.
+            loader (callable, optional): Overrides the registry's default loader for this file.
+
+        Returns:
+            object: The loaded artifact.
+        """
+        path = os.path.join(self.base_path, filename)
+        stat = os.stat(path)
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+
+            try:
+                artifact = (loader or self._loader)(path)
+            except Exception as e:
+                if entry is not None:
+                    # The file may be mid-write by train_model.py; keep serving the previous version
+                    logging.warning("Reload of %s failed, keeping cached version: %s", path, e)
+                    return entry[1]
+                logging.error("Failed to load artifact from %s: %s", path, e)
+                raise
+
+            self._entries[filename] = (signature, artifact)
+            self.loads += 1
+            if entry is not None:
+                self.reloads += 1
+            logging.info("Artifact %s from %s", "reloaded" if entry is not None else "loaded", path)
+            return artifact
+
+    @property
+    def base_path(self):
+        """
+        Directory of the current artifacts (the current bundle, or the root itself).
+        """
+        return resolve_artifact_dir(self.root)
+
+    def version(self, filename):
+        """
+        Returns the on-disk signature (path, mtime, size) of the cached artifact, or None if not loaded.
+        """
+        entry = self._entries.get(filename)
+        return entry[0] if entry is not None else None
+
+    def model(self, model_key):
+        """
+        Returns the trained model saved as <model_key>_model.pkl.
+        """
+        return self.get(f"{model_key}_model.pkl")
+
+    def scoring_model(self, model_key):
+        """
+        Returns the compiled NumPy version of the model when it was exported, else the pickled model.
+        """
+        if model_key == ENSEMBLE_KEY:
+            return self.ensemble()
+        # meta.json is written last, so its stat marks a complete export
+        meta_filename = os.path.join(f"{model_key}{COMPILED_SUFFIX}", "meta.json")
+        if os.path.exists(os.path.join(self.base_path, meta_filename)):
+            return self.get(meta_filename, loader=lambda path: load_compiled_model(os.path.dirname(path)))
+        return self.model(model_key)
+
+    def ensemble(self):
+        """
+        Returns the weighted ensemble described by ensemble.json, over the members' scoring models.
+        """
+        def load_json(path):
+            with open(path) as f:
+                return json.load(f)
+
+        weights = self.get(ENSEMBLE_FILENAME, loader=load_json)["weights"]
+        members = {key: self.scoring_model(key) for key in weights}
+        # Compiled members carry their scaling, so the scaler is only unpickled for sklearn members
+        needs_scaler = not all(getattr(model, 'includes_scaling', False) for model in members.values())
+        return EnsembleModel(members, weights, self.scaler() if needs_scaler else None)
+
+    def scaler(self):
+        """
+        Returns the fitted scaler.
+        """
+        return self.get("scaler.pkl")
+
+    def preprocessor(self):
+        """
+        Returns the fitted preprocessor.
+        """
+        return self.get("preprocessor.pkl")
+
+    def clear(self):
+        """
+        Drops every cached artifact.
+        """
+        with self._lock:
+            self._entries.clear()
+
+# Shared by every Streamlit session running in this process
+registry = ArtifactRegistry()
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import hashlib
+import inspect
+import logging
+
+import joblib
+
+from src.config import STAGE_CACHE_DIR, STAGE_CACHE_MAX_BYTES
+from src.utils.instrumentation import metrics
+
+# Stages of train_model.train_pipeline in run order (--from-stage forces a stage and all later ones)
+STAGES = ('load', 'preprocess', 'split', 'tune', 'train', 'evaluate', 'compact')
+
+def file_hash(path):
+    """
+    Returns the sha256 of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_version(*modules):
+    """
+    Returns a hash of the source files of the given modules, so editing a stage's code invalidates it.
+    """
+    return hashlib.sha256(''.join(file_hash(inspect.getsourcefile(module)) for module in modules).encode()).hexdigest()
+
+def stage_key(stage, **inputs):
+    """
+    Hashes a stage name and its inputs (upstream keys, file hashes, code versions, parameters).
+    """
+    payload = json.dumps({'stage': stage, **inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class StageCache:
+    """
+    On-disk cache of pipeline stage outputs, keyed by a hash of each stage's inputs.
+
+    Entries are pickled with joblib to root/<stage>/<key>.pkl (written atomically).
+    Every hit refreshes the entry's modification time, and after each write the
+    least recently used entries are deleted until the cache fits in max_bytes.
+    Stages listed in `force` are recomputed even when an entry exists.
+    """
+
+    def __init__(self, root=STAGE_CACHE_DIR, max_bytes=STAGE_CACHE_MAX_BYTES, force=()):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.force = set(force)
+        self.report = []
+
+    def _path(self, stage, key):
+        return os.path.join(self.root, stage, f"{key}.pkl")
+
+    def contains(self, stage, key):
+        """
+        True when run() would load the stage from the cache (an entry exists and the stage is not forced).
+        """
+        return stage not in self.force and os.path.exists(self._path(stage, key))
+
+    def run(self, stage, key, compute, label=None, prior_seconds=0.0):
+        """
+        Returns the cached output of a stage, or computes and stores it.
+
+        Args:
+            stage (str): Stage name (also the cache sub-directory).
+            key (str): Hash of the stage's inputs, see stage_key.
+            compute (callable): Produces the stage output on a miss.
+            label (str, optional): Shown in the report instead of the stage name (e.g. 'train:random_forest').
+            prior_seconds (float): Time already spent producing the output before this call (e.g. a model
+                fitted in parallel with others), added to the reported time on a miss.
+
+        Returns:
+            object: The stage output.
+        """
+        path = self._path(stage, key)
+        forced = stage in self.force
+        start = time.perf_counter()
+        if self.contains(stage, key):
+            try:
+                value = joblib.load(path)
+                os.utime(path)
+                self._record(stage, label, key, 'hit', start)
+                return value
+            except Exception as e:
+                logging.warning("Unreadable stage cache entry %s, recomputing: %s", path, e)
+
+        value = compute()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            joblib.dump(value, tmp_path)
+            os.replace(tmp_path, path)
+            self.evict()
+        except Exception as e:
+            # A full disk must not fail the training run
+            logging.warning("Failed to cache stage %s: %s", stage, e)
+        self._record(stage, label, key, 'forced' if forced else 'miss', start - prior_seconds)
+        return value
+
+    def _record(self, stage, label, key, status, start):
+        seconds = time.perf_counter() - start
+        self.report.append({'stage': label or stage, 'status': status, 'key': key[:12], 'seconds': seconds})
+        metrics.increment('loan_stage_cache_total', stage=stage, status=status)
+        logging.info("Stage %s: %s (%s) in %.2fs", label or stage, status, key[:12], seconds)
+
+    def evict(self):
+        """
+        Deletes least recently used entries until the cache is within max_bytes.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        entries = []
+        for directory, _, files in os.walk(self.root):
+            for filename in files:
+                if filename.endswith('.pkl'):
+                    stat = os.stat(os.path.join(directory, filename))
+                    entries.append((stat.st_mtime_ns, stat.st_size, os.path.join(directory, filename)))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        if removed:
+            logging.info("Evicted %d stage cache entries from %s", removed, self.root)
+        return removed
+
+    def format_report(self):
+        """
+        Renders which stages hit the cache as a plain-text table.
+        """
+        lines = [f"{'Stage':<32} {'Status':<7} {'Key':<13} {'Seconds':>8}"]
+        lines += [f"{entry['stage']:<32} {entry['status']:<7} {entry['key']:<13} {entry['seconds']:>8.2f}"
+                  for entry in self.report]
+        return "\n".join(lines)
+
+    def all_hits(self):
+        """
+        True when every stage run so far was loaded from the cache.
+        """
+        return all(entry['status'] == 'hit' for entry in self.report)
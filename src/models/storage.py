@@ -1,17 +1,23 @@
 import os
+import json
+import time
+import shutil
+import hashlib
 import joblib
 import logging
 
-logging.basicConfig(filename='loan_app.log', level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+from src.models.compiled import COMPILED_SUFFIX, export_compiled_models, save_compiled_arrays
 
-def save_models(models: dict, scaler, base_path):
+
+def save_models(models: dict, scaler, base_path, preprocessor=None):
     """
-    Saves multiple trained models and a scaler to disk using joblib.
+    Saves multiple trained models, a scaler and optionally the fitted preprocessor to disk using joblib.
 
     Args:
         models (dict): Dictionary of model name to model object.
         scaler: Fitted scaler used for input features.
         base_path (str): Base directory where model files will be saved.
+        preprocessor (Preprocessor, optional): Fitted preprocessor, saved next to the scaler.
     """
     try:
         os.makedirs(base_path, exist_ok=True)
@@ -24,13 +30,19 @@ def save_models(models: dict, scaler, base_path):
         joblib.dump(scaler, scaler_path)
         logging.info(f"Scaler saved to {scaler_path}")
 
+        if preprocessor is not None:
+            preprocessor_path = os.path.join(base_path, "preprocessor.pkl")
+            joblib.dump(preprocessor, preprocessor_path)
+            logging.info(f"Preprocessor saved to {preprocessor_path}")
+
     except Exception as e:
         logging.error(f"Failed to save models or scaler: {e}")
         raise
 
-def load_model(model_path):
+def load_model(model_path, mmap=False):
     try:
-        model = joblib.load(model_path)
+        # Uncompressed joblib files can map their NumPy arrays instead of copying them
+        model = joblib.load(model_path, mmap_mode='r' if mmap else None)
         logging.info(f"Model loaded from {model_path}")
         return model
     except Exception as e:
@@ -45,3 +57,160 @@ def load_scaler(scaler_path):
     except Exception as e:
         logging.error(f"Failed to load scaler from {scaler_path}: {e}")
         raise
+
+def load_preprocessor(preprocessor_path):
+    try:
+        preprocessor = joblib.load(preprocessor_path)
+        logging.info(f"Preprocessor loaded from {preprocessor_path}")
+        return preprocessor
+    except Exception as e:
+        logging.error(f"Failed to load preprocessor from {preprocessor_path}: {e}")
+        raise
+
+BUNDLES_DIR = "bundles"
+CURRENT_POINTER = "CURRENT"
+# Published bundles kept besides the current one; older ones are deleted after each publish
+PREVIOUS_BUNDLES_KEPT = 3
+# Written into each bundle by train_model.py: a hash of everything the bundle was built from
+BUNDLE_KEY_FILENAME = "bundle_key.json"
+
+def _directory_hash(directory):
+    digest = hashlib.sha256()
+    for root, _, files in sorted(os.walk(directory)):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            digest.update(os.path.relpath(path, directory).encode())
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+def save_bundle(models: dict, scaler, base_path, preprocessor=None, json_files=None, background_data=None,
+                compiled_models=None, keep=PREVIOUS_BUNDLES_KEPT):
+    """
+    Saves one training run as an immutable, content-hashed bundle and makes it current.
+
+    The bundle directory base_path/bundles/<hash> holds the models, scaler,
+    preprocessor, compiled models, JSON metrics and SHAP background data under the
+    same file names as the loose layout. It is assembled in a staging directory,
+    renamed into place and then published by atomically replacing base_path/CURRENT,
+    so readers never see a half-written run. Afterwards only the current bundle and the
+    `keep` most recently published others are kept.
+
+    Args:
+        models (dict): Dictionary of model name to model object.
+        scaler: Fitted scaler used for input features.
+        base_path (str): Model directory holding bundles/ and CURRENT.
+        preprocessor (Preprocessor, optional): Fitted preprocessor.
+        json_files (dict, optional): File name to JSON-serializable object (metrics, tuning results).
+        background_data (pd.DataFrame, optional): Scaled background sample for SHAP.
+        compiled_models (dict, optional): Name to compiled arrays for NumPy-only models without a
+            pickle (e.g. the compacted forest), saved as <name>_compiled.
+        keep (int): Previously published bundles to keep for rolling back.
+
+    Returns:
+        str: The bundle id (content hash prefix).
+    """
+    bundles_path = os.path.join(base_path, BUNDLES_DIR)
+    staging_path = os.path.join(bundles_path, f".staging-{os.getpid()}-{time.time_ns()}")
+    try:
+        save_models(models, scaler, staging_path, preprocessor=preprocessor)
+        export_compiled_models(models, scaler, staging_path)
+        for name, arrays in (compiled_models or {}).items():
+            save_compiled_arrays(arrays, os.path.join(staging_path, f"{name}{COMPILED_SUFFIX}"))
+        for filename, content in (json_files or {}).items():
+            with open(os.path.join(staging_path, filename), 'w') as f:
+                json.dump(content, f, default=str)
+        if background_data is not None:
+            background_data.to_csv(os.path.join(staging_path, "background_data.csv"), index=False)
+
+        bundle_id = _directory_hash(staging_path)[:16]
+        bundle_path = os.path.join(bundles_path, bundle_id)
+        if os.path.exists(bundle_path):
+            # Identical content was already published
+            shutil.rmtree(staging_path)
+        else:
+            os.rename(staging_path, bundle_path)
+        # The publish time orders the bundles for pruning
+        os.utime(bundle_path)
+
+        pointer_path = os.path.join(base_path, CURRENT_POINTER)
+        with open(pointer_path + ".tmp", 'w') as f:
+            f.write(bundle_id + "\n")
+        os.replace(pointer_path + ".tmp", pointer_path)
+        logging.info(f"Bundle {bundle_id} saved to {bundle_path} and made current")
+        prune_bundles(base_path, keep)
+        return bundle_id
+
+    except Exception as e:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        logging.error(f"Failed to save bundle: {e}")
+        raise
+
+def prune_bundles(base_path, keep=PREVIOUS_BUNDLES_KEPT):
+    """
+    Deletes published bundles beyond the current one and the `keep` most recent others.
+
+    Bundles are ordered by the modification time of their directory (set when published).
+    Staging directories of runs still in progress are left alone, and a bundle that cannot
+    be deleted is logged rather than failing the run that published the new one.
+
+    Returns:
+        list: Ids of the deleted bundles.
+    """
+    bundles_path = os.path.join(base_path, BUNDLES_DIR)
+    current = os.path.basename(resolve_artifact_dir(base_path))
+    bundles = [entry for entry in os.scandir(bundles_path)
+               if entry.is_dir() and not entry.name.startswith('.') and entry.name != current]
+    bundles.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    removed = []
+    for entry in bundles[keep:]:
+        try:
+            shutil.rmtree(entry.path)
+            removed.append(entry.name)
+        except OSError as e:
+            logging.warning(f"Failed to delete old bundle {entry.name}: {e}")
+    if removed:
+        logging.info(f"Deleted {len(removed)} old bundles from {bundles_path}")
+    return removed
+
+def resolve_artifact_dir(base_path="models"):
+    """
+    Returns the directory holding the current artifacts.
+
+    That is the bundle named in base_path/CURRENT, or base_path itself when no
+    bundle was published yet (the loose, pretrained layout).
+    """
+    pointer_path = os.path.join(base_path, CURRENT_POINTER)
+    try:
+        with open(pointer_path) as f:
+            bundle_id = f.read().strip()
+    except FileNotFoundError:
+        return base_path
+    bundle_path = os.path.join(base_path, BUNDLES_DIR, bundle_id)
+    if not os.path.isdir(bundle_path):
+        logging.error(f"CURRENT points to missing bundle {bundle_id}; using {base_path}")
+        return base_path
+    return bundle_path
+
+def current_bundle_key(base_path="models"):
+    """
+    Returns the bundle key of the current bundle, if it can still be trusted.
+
+    Returns:
+        tuple: (bundle id, key from its bundle_key.json), or None when no bundle is current,
+            it has no key file, or its content no longer hashes to its id.
+    """
+    bundle_path = resolve_artifact_dir(base_path)
+    if bundle_path == base_path:
+        return None
+    bundle_id = os.path.basename(bundle_path)
+    try:
+        with open(os.path.join(bundle_path, BUNDLE_KEY_FILENAME)) as f:
+            key = json.load(f)["key"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if _directory_hash(bundle_path)[:16] != bundle_id:
+        logging.warning(f"Bundle {bundle_id} no longer matches its content hash")
+        return None
+    return bundle_id, key
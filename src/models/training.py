@@ -1,36 +1,295 @@
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from concurrent.futures import ProcessPoolExecutor
+from threadpoolctl import threadpool_limits
+import numpy as np
+import hashlib
+import itertools
+import json
 import logging
+import os
+import time
 
-logging.basicConfig(filename='loan_app.log', level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+from src.models.boosting import HIST_GRADIENT_BOOSTING_KEY, build_hist_gradient_boosting
 
-def train_logistic_regression(X_train, y_train):
+# Used both when tuning and for the final model, so the model that ships is the configuration that was tuned
+LOGISTIC_REGRESSION_MAX_ITER = 1000
+
+def train_logistic_regression(X_train, y_train, **params):
     """
     Train Logistic Regression model.
 
+    Parameters:
+    **params: Extra LogisticRegression hyperparameters (e.g. a tuned C).
+
     Returns:
     model: Trained logistic regression model, or None if training fails.
     """
     try:
-        model = LogisticRegression().fit(X_train, y_train)
+        model = LogisticRegression(max_iter=LOGISTIC_REGRESSION_MAX_ITER, **params).fit(X_train, y_train)
         logging.info("Logistic Regression trained successfully.")
         return model
     except Exception as e:
         logging.error("Error training Logistic Regression: %s", e)
         return None
 
-def train_random_forest(X_train, y_train, n_estimators=100, max_depth=None):
+def train_random_forest(X_train, y_train, n_estimators=100, max_depth=None, n_jobs=None, **params):
     """
     Train Random Forest model.
 
+    Parameters:
+    n_jobs (int, optional): Number of cores used to build the trees (None uses one).
+    **params: Extra RandomForestClassifier hyperparameters (e.g. tuned min_samples_leaf).
+
     Returns:
     model: Trained random forest model, or None if training fails.
     """
     try:
-        model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth)
+        model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth, n_jobs=n_jobs, **params)
         model.fit(X_train, y_train)
         logging.info("Random Forest trained successfully.")
         return model
     except Exception as e:
         logging.error("Error training Random Forest: %s", e)
         return None
+
+def train_hist_gradient_boosting(X_train, y_train, n_threads=None, **params):
+    """
+    Train a histogram gradient boosting model on raw (unencoded, unscaled) features.
+
+    Categorical columns are consumed natively and missing values are handled by the
+    model itself, so it takes the raw split from split_raw_train_test.
+
+    Parameters:
+    n_threads (int, optional): Cap on the OpenMP threads used to build the trees (None uses all).
+    **params: Extra HistGradientBoostingClassifier hyperparameters (e.g. max_iter).
+
+    Returns:
+    model: Trained NativeCategoricalPipeline, or None if training fails.
+    """
+    try:
+        with threadpool_limits(limits=n_threads, user_api="openmp"):
+            model = build_hist_gradient_boosting(**params).fit(X_train, y_train)
+        logging.info("Histogram Gradient Boosting trained successfully.")
+        return model
+    except Exception as e:
+        logging.error("Error training Histogram Gradient Boosting: %s", e)
+        return None
+
+def _timed_fit(trainer, X_train, y_train, kwargs):
+    start = time.perf_counter()
+    model = trainer(X_train, y_train, **kwargs)
+    return model, time.perf_counter() - start
+
+def train_models_in_parallel(X_train, y_train, worker_budget=None, params=None, names=None, raw_X_train=None):
+    """
+    Train Random Forest, Logistic Regression and (given raw features) Histogram Gradient Boosting concurrently.
+
+    The logistic regression is single-threaded, so it gets one core; the forest and
+    the boosting model split the rest of the budget between them. The levels of
+    parallelism never use more than worker_budget cores together. With a budget of 1
+    the models are trained one after the other in the current process.
+
+    Parameters:
+    worker_budget (int, optional): Total cores to use (defaults to all cores).
+    params (dict, optional): Model name to extra hyperparameters, e.g. tuned configurations.
+    names (list, optional): Subset of models to train (defaults to all the inputs allow).
+    raw_X_train (pd.DataFrame, optional): Raw training rows for the boosting model, which
+        takes them instead of the scaled X_train (same rows, same y_train).
+
+    Returns:
+    tuple: (dict of model name to trained model, dict of model name to fit seconds)
+    """
+    budget = max(1, worker_budget or os.cpu_count() or 1)
+    params = params or {}
+    default_names = ("random_forest", "logistic_regression")
+    if raw_X_train is not None:
+        default_names += (HIST_GRADIENT_BOOSTING_KEY,)
+    names = list(names or default_names)
+    # The multi-threaded models share what the logistic regression leaves of the budget
+    shared = max(1, budget - 1) if "logistic_regression" in names else budget
+    boosting_threads = max(1, shared // 2) if "random_forest" in names else shared
+    forest_jobs = max(1, shared - boosting_threads) if HIST_GRADIENT_BOOSTING_KEY in names else shared
+    jobs = {
+        "random_forest": (train_random_forest, X_train,
+                          {**params.get("random_forest", {}), "n_jobs": forest_jobs}),
+        "logistic_regression": (train_logistic_regression, X_train, dict(params.get("logistic_regression", {}))),
+        HIST_GRADIENT_BOOSTING_KEY: (train_hist_gradient_boosting, raw_X_train,
+                                     {**params.get(HIST_GRADIENT_BOOSTING_KEY, {}), "n_threads": boosting_threads}),
+    }
+    jobs = {name: jobs[name] for name in names}
+
+    if budget == 1 or len(jobs) == 1:
+        results = {name: _timed_fit(trainer, X, y_train, kwargs) for name, (trainer, X, kwargs) in jobs.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = {
+                name: executor.submit(_timed_fit, trainer, X, y_train, kwargs)
+                for name, (trainer, X, kwargs) in jobs.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+
+    models = {name: model for name, (model, _) in results.items()}
+    if models.get("random_forest") is not None:
+        # Parallelism is only wanted for fitting; single-row predictions are faster without it
+        models["random_forest"].n_jobs = None
+    timings = {name: seconds for name, (_, seconds) in results.items()}
+    logging.info("Models trained with a budget of %d cores: %s", budget, timings)
+    return models, timings
+
+SEARCH_SPACES = {
+    "random_forest": {
+        "n_estimators": [50, 100, 200, 400],
+        "max_depth": [None, 4, 6, 8, 12],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": ["sqrt", 0.5, None],
+    },
+    "logistic_regression": {
+        "C": [0.01, 0.1, 0.3, 1.0, 3.0, 10.0, 100.0],
+        "class_weight": [None, "balanced"],
+    },
+}
+
+def _build_estimator(name, params):
+    if name == "random_forest":
+        return RandomForestClassifier(random_state=42, **params)
+    if name == "logistic_regression":
+        return LogisticRegression(max_iter=LOGISTIC_REGRESSION_MAX_ITER, **params)
+    raise ValueError(f"Unknown model '{name}'")
+
+def _sample_configs(space, n_candidates, random_state):
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    rng = np.random.RandomState(random_state)
+    order = rng.permutation(len(grid))[:n_candidates]
+    return [grid[i] for i in order]
+
+def _config_key(name, params, n_samples, data_hash, cv):
+    payload = json.dumps([name, params, n_samples, data_hash, cv], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _score_config(name, params, X, y, n_samples, cv, random_state, deadline=None):
+    """
+    Mean stratified cross-validated accuracy of one configuration on the first n_samples rows.
+
+    Returns None without fitting when the wall-clock deadline (time.time()) has passed.
+    """
+    if deadline is not None and time.time() >= deadline:
+        return None
+    start = time.perf_counter()
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    scores = cross_val_score(_build_estimator(name, params), X[:n_samples], y[:n_samples], cv=folds)
+    return float(scores.mean()), time.perf_counter() - start
+
+def tune_hyperparameters(name, X_train, y_train, n_candidates=27, eta=3, min_samples=None, cv=3,
+                         time_budget=None, max_workers=None, cache_dir="cache/tuning", random_state=42):
+    """
+    Successive-halving search over the model's hyperparameters.
+
+    Each round scores the surviving configurations with stratified cross-validation
+    on a growing stratified subsample, keeps the best 1/eta of them and multiplies
+    the sample size by eta, until one configuration is left or the full training set
+    is used. Configurations within a round are scored in parallel. Every score is
+    appended to cache_dir/<name>.jsonl, so an interrupted search resumes without
+    recomputing finished configurations.
+
+    Parameters:
+    name (str): 'random_forest' or 'logistic_regression'.
+    n_candidates (int): Configurations sampled from SEARCH_SPACES for the first round.
+    eta (int): Fraction of configurations dropped per round (keep 1/eta).
+    min_samples (int, optional): Rows used in the first round; derived from the rounds needed if None.
+    time_budget (float, optional): Wall-clock seconds after which no further configuration is fitted
+        (checked before each fit; the first configuration is always scored so the search has a result).
+    max_workers (int, optional): Processes scoring configurations concurrently.
+
+    Returns:
+    dict: Winning params, its cross-validated accuracy, the samples it was scored on and the round history.
+    """
+    try:
+        start = time.perf_counter()
+        deadline = None if time_budget is None else time.time() + time_budget
+        # Order rows so that every prefix keeps the class proportions (stratified subsamples)
+        y = np.asarray(y_train)
+        rng = np.random.RandomState(random_state)
+        rank = np.empty(len(y))
+        for label in np.unique(y):
+            members = np.flatnonzero(y == label)
+            rank[members] = (rng.permutation(len(members)) + rng.uniform(size=len(members))) / len(members)
+        order = np.argsort(rank, kind="stable")
+        X = np.asarray(X_train)[order]
+        y = y[order]
+        data_hash = hashlib.sha256(X.tobytes() + y.tobytes()).hexdigest()
+
+        candidates = _sample_configs(SEARCH_SPACES[name], n_candidates, random_state)
+        n_rounds, remaining = 1, len(candidates)
+        while remaining > 1:
+            remaining = max(1, remaining // eta)
+            n_rounds += 1
+        # The last round scores the survivor on the full training set
+        n_samples = min_samples or max(cv * 10, len(y) // eta ** (n_rounds - 1))
+
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f"{name}.jsonl")
+        cache = {}
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    cache[entry["key"]] = entry
+
+        history = []
+        best = None
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                n_samples = min(n_samples, len(y))
+                keys = [_config_key(name, params, n_samples, data_hash, cv) for params in candidates]
+                # The very first configuration ignores the deadline, so the search always has a result
+                futures = {
+                    key: executor.submit(_score_config, name, params, X, y, n_samples, cv, random_state,
+                                         deadline if best is not None or i > 0 else None)
+                    for i, (key, params) in enumerate(zip(keys, candidates)) if key not in cache
+                }
+                skipped = 0
+                for key, params in zip(keys, candidates):
+                    if key in futures:
+                        result = futures[key].result()
+                        if result is None:
+                            skipped += 1
+                            continue
+                        score, seconds = result
+                        cache[key] = {"key": key, "params": params, "n_samples": n_samples,
+                                      "score": score, "seconds": seconds}
+                        with open(cache_path, "a") as f:
+                            f.write(json.dumps(cache[key], default=str) + "\n")
+
+                scored = [(key, params) for key, params in zip(keys, candidates) if key in cache]
+                if skipped and best is not None:
+                    # An incomplete round cannot rank its candidates; the previous round's winner stands
+                    history.append({"n_samples": n_samples, "n_candidates": len(candidates),
+                                    "cached": len(candidates) - len(futures), "skipped": skipped})
+                    logging.info("Tuning %s stopped by the %.0fs time budget after %d of %d configs on %d rows.",
+                                 name, time_budget, len(scored), len(candidates), n_samples)
+                    break
+                ranked = sorted(scored, key=lambda item: cache[item[0]]["score"], reverse=True)
+                best = {"params": ranked[0][1], "cv_accuracy": cache[ranked[0][0]]["score"], "n_samples": n_samples}
+                history.append({"n_samples": n_samples, "n_candidates": len(candidates),
+                                "cached": len(candidates) - len(futures), "skipped": skipped,
+                                "best_cv_accuracy": best["cv_accuracy"]})
+                logging.info("Tuning %s: %d configs on %d rows, best %.4f",
+                             name, len(scored), n_samples, best["cv_accuracy"])
+
+                if len(candidates) == 1 or n_samples >= len(y):
+                    break
+                if time_budget is not None and time.perf_counter() - start >= time_budget:
+                    logging.info("Tuning %s stopped by the %.0fs time budget.", name, time_budget)
+                    break
+                candidates = [params for _, params in ranked[:max(1, len(candidates) // eta)]]
+                n_samples *= eta
+
+        best["history"] = history
+        best["seconds"] = time.perf_counter() - start
+        return best
+
+    except Exception as e:
+        logging.error("Error tuning %s: %s", name, e)
+        raise
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+from src.models.prediction import predict_batch
+from src.utils.instrumentation import metrics
+
+WHAT_IF_FEATURES = ['LoanAmount', 'ApplicantIncome', 'CoapplicantIncome', 'Loan_Amount_Term']
+LOAN_TERMS = [120, 180, 240, 300, 360, 480]
+
+def _axis(feature, value):
+    """
+    Candidate values of one feature around the applicant's value (always included).
+    """
+    value = float(value)
+    if feature == 'LoanAmount':
+        candidates = np.maximum(np.round(max(value, 1.0) * np.linspace(0.2, 1.5, 14)), 1)
+    elif feature == 'ApplicantIncome':
+        candidates = np.round(max(value, 500.0) * np.linspace(0.5, 3.0, 11), -1)
+    elif feature == 'CoapplicantIncome':
+        candidates = np.round(value + max(value, 2000.0) * np.linspace(0, 2.0, 9), -1)
+    elif feature == 'Loan_Amount_Term':
+        candidates = np.array(LOAN_TERMS, dtype=float)
+    else:
+        raise ValueError(f"Unsupported what-if feature '{feature}'")
+    return np.unique(np.r_[candidates, value])
+
+def build_what_if_grid(user_input, features=WHAT_IF_FEATURES, axes=None):
+    """
+    Builds every combination of the what-if features, all other fields held at the applicant's values.
+
+    Args:
+        user_input (dict): Submitted applicant (form fields).
+        features (list): Features to vary.
+        axes (dict, optional): Explicit candidate values per feature, overriding the defaults.
+
+    Returns:
+        tuple: (grid DataFrame of raw applicant rows, dict of feature to candidate values)
+    """
+    axes = {feature: np.asarray((axes or {}).get(feature, _axis(feature, user_input[feature])), dtype=float)
+            for feature in features}
+    mesh = np.meshgrid(*axes.values(), indexing='ij')
+    size = mesh[0].size
+
+    columns = {column: np.repeat(np.array([value], dtype=object), size) for column, value in user_input.items()}
+    for feature, values in zip(axes, mesh):
+        columns[feature] = values.ravel()
+    return pd.DataFrame(columns), axes
+
+def what_if_analysis(user_input, preprocessor, model, scaler, target=50.0, features=WHAT_IF_FEATURES, axes=None):
+    """
+    Scores a grid of variants of one applicant and finds the smallest change that crosses a target.
+
+    The whole grid is scored with one predict_batch call. For each feature the
+    smallest change (other features unchanged) that moves the probability to the
+    other side of `target` is reported: the change needed to get approved, or the
+    headroom before an approved applicant would drop below the target.
+
+    Args:
+        user_input (dict): Submitted applicant (form fields).
+        preprocessor: Fitted Preprocessor.
+        model: Trained or compiled model.
+        scaler: Fitted scaler (unused by compiled models).
+        target (float): Approval probability threshold on the 0-100 scale.
+        features (list): Features to vary.
+        axes (dict, optional): Explicit candidate values per feature.
+
+    Returns:
+        dict: 'baseline' and 'target' probabilities, the 'applicant' values of the varied
+            features, 'axes', 'surface' (grid with a 'probability' column),
+            'smallest_changes' per feature and 'best_feature'.
+    """
+    with metrics.span('what_if_grid'):
+        grid, axes = build_what_if_grid(user_input, features, axes)
+    with metrics.span('what_if_score'):
+        grid['probability'] = predict_batch(grid, preprocessor, model, scaler)
+
+    original = {feature: float(user_input[feature]) for feature in axes}
+    unchanged = {feature: grid[feature].to_numpy() == value for feature, value in original.items()}
+    all_unchanged = np.logical_and.reduce(list(unchanged.values()))
+    baseline = float(grid.loc[all_unchanged, 'probability'].iloc[0])
+    approved = baseline >= target
+
+    smallest_changes = {}
+    for feature, value in original.items():
+        others = np.ones(len(grid), dtype=bool)
+        for other, mask in unchanged.items():
+            if other != feature:
+                others &= mask
+        line = grid.loc[others, [feature, 'probability']]
+        crossed = line[(line['probability'] >= target) != approved]
+        if crossed.empty:
+            smallest_changes[feature] = None
+            continue
+        best = crossed.iloc[np.argmin(np.abs(crossed[feature].to_numpy() - value))]
+        change = float(best[feature] - value)
+        smallest_changes[feature] = {
+            'from': value,
+            'to': float(best[feature]),
+            'change': change,
+            'relative_change': change / value if value else None,
+            'probability': float(best['probability']),
+        }
+
+    # The feature that crosses with the smallest relative move (absolute moves are not comparable)
+    relative = {feature: abs(entry['relative_change']) for feature, entry in smallest_changes.items()
+                if entry is not None and entry['relative_change'] is not None}
+    return {
+        'baseline': baseline,
+        'target': float(target),
+        'approved': approved,
+        'applicant': original,
+        'axes': {feature: values.tolist() for feature, values in axes.items()},
+        'surface': grid[list(axes) + ['probability']],
+        'smallest_changes': smallest_changes,
+        'best_feature': min(relative, key=relative.get) if relative else None,
+    }
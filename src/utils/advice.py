@@ -1,26 +1,196 @@
-def generate_advice(user_input):
+import os
+import json
+import logging
+import operator
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.config import ADVICE_RULES_PATH
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+RULE_FIELDS = ('code', 'column', 'op', 'value', 'message')
+# Signature of a rules file that could not be stat'ed
+_UNAVAILABLE = 'unavailable'
+
+class AdviceRule:
     """
-    Generate loan approval improvement tips based on user input.
+    One declarative advice rule: `message` applies when `column op value` holds.
 
-    Args:
-        user_input (dict): Form input provided by user.
+    A missing field counts as `default`, like dict.get in the original form checks.
+    """
+
+    def __init__(self, code, column, op, value, message, default=None):
+        if op not in OPERATORS:
+            raise ValueError(f"Advice rule '{code}' has unknown operator '{op}'")
+        self.code = code
+        self.column = column
+        self.op = op
+        self.value = value
+        self.message = message
+        self.default = default
+        self._compare = OPERATORS[op]
+
+    def applies(self, user_input):
+        """
+        Evaluates the rule on one applicant dict, with the same coercion as mask.
+        """
+        if self.column not in user_input:
+            return bool(self._compare(self.default, self.value))
+        value = user_input[self.column]
+        if isinstance(self.value, (int, float)) or isinstance(value, (int, float)):
+            # String numbers from JSON or form input compare as numbers; unparsable ones never match
+            number = pd.to_numeric(value, errors='coerce') if pd.api.types.is_scalar(value) else np.nan
+            return bool(pd.notna(number) and self._compare(float(number), float(self.value)))
+        if value is None:
+            return False
+        return bool(self._compare(value, self.value))
+
+    def mask(self, df):
+        """
+        Evaluates the rule on every row of a DataFrame at once.
+
+        Numeric columns (e.g. Credit_History read from a CSV as 0.0/1.0) are compared
+        numerically, also against a string value such as '0.0'; text columns compare
+        as the dict form does. Missing values never match.
+
+        Returns:
+            np.ndarray: Boolean mask, True where the advice applies.
+        """
+        if self.column not in df:
+            return np.full(len(df), bool(self._compare(self.default, self.value)))
+        values = df[self.column]
+        numeric = isinstance(self.value, (int, float)) or pd.api.types.is_numeric_dtype(values)
+        if numeric:
+            values = pd.to_numeric(values, errors='coerce')
+            return (self._compare(values, float(self.value)) & values.notna()).to_numpy(dtype=bool)
+        return (self._compare(values, self.value) & values.notna()).fillna(False).to_numpy(dtype=bool)
+
+def load_rules(path=ADVICE_RULES_PATH):
+    """
+    Reads and validates the advice rules from a JSON list.
 
     Returns:
-        list: List of advice strings.
+        list: AdviceRule objects in file order (the order advice is shown in).
     """
-    advice = []
+    with open(path) as f:
+        entries = json.load(f)
+    rules = []
+    for entry in entries:
+        missing = [field for field in RULE_FIELDS if field not in entry]
+        if missing:
+            raise ValueError(f"Advice rule {entry.get('code', '?')} is missing {', '.join(missing)}")
+        rules.append(AdviceRule(**{key: entry[key] for key in RULE_FIELDS + ('default',) if key in entry}))
+    codes = [rule.code for rule in rules]
+    if len(set(codes)) != len(codes):
+        raise ValueError("Advice rule codes must be unique")
+    return rules
 
-    # Check income
-    if user_input.get('ApplicantIncome', 0) < 3000:
-        advice.append("Consider increasing your monthly income to improve eligibility.")
+class AdviceEngine:
+    """
+    Advice rules loaded from config and evaluated per applicant or per DataFrame.
 
-    # Check loan amount
-    if user_input.get('LoanAmount', 0) > 200:
-        advice.append("Consider requesting a lower loan amount to enhance approval chances.")
+    The rules file is stat'ed on every use and reloaded when its modification time
+    or size changes, so rules can be edited without restarting the app or service.
+    A file that fails to parse, or that is moved or removed, is logged and the previous
+    rules stay in use.
+    """
 
-    # Check credit history
-    credit_history = user_input.get('Credit_History', '1.0')
-    if credit_history == '0.0':
-        advice.append("Building a positive credit history can significantly boost your chances.")
+    def __init__(self, path=ADVICE_RULES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._rules = []
+        self.reloads = 0
 
-    return advice
+    @property
+    def rules(self):
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            if self._signature is None:
+                raise
+            with self._lock:
+                if self._signature != _UNAVAILABLE:
+                    logging.error("Advice rules file %s is unavailable, keeping previous rules: %s", self.path, e)
+                    self._signature = _UNAVAILABLE
+            return self._rules
+        if signature == self._signature:
+            return self._rules
+        with self._lock:
+            if signature != self._signature:
+                try:
+                    self._rules = load_rules(self.path)
+                    if self._signature is not None:
+                        self.reloads += 1
+                    logging.info("Advice rules %s from %s", "reloaded" if self.reloads else "loaded", self.path)
+                except (OSError, ValueError, TypeError) as e:
+                    if self._signature is None:
+                        raise
+                    logging.error("Failed to reload advice rules from %s, keeping previous rules: %s", self.path, e)
+                self._signature = signature
+        return self._rules
+
+    def advise(self, user_input):
+        """
+        Returns the advice messages for one applicant dict.
+        """
+        return [rule.message for rule in self.rules if rule.applies(user_input)]
+
+    def evaluate(self, df):
+        """
+        Evaluates every rule on every row in one vectorized pass.
+
+        Returns:
+            pd.DataFrame: One boolean column per advice code (in rule order), indexed like df.
+        """
+        rules = self.rules
+        return pd.DataFrame({rule.code: rule.mask(df) for rule in rules}, index=df.index,
+                            columns=[rule.code for rule in rules])
+
+    def codes(self, df):
+        """
+        Returns the list of advice codes that apply to each row.
+        """
+        matches = self.evaluate(df)
+        codes = np.array(matches.columns, dtype=object)
+        return [codes[row].tolist() for row in matches.to_numpy()]
+
+    def messages(self, df, separator=' | '):
+        """
+        Joins the advice messages of each row into one string, column-wise over the rules.
+
+        Returns:
+            pd.Series: Advice text per row (empty when no rule applies).
+        """
+        text = pd.Series('', index=df.index, dtype=object)
+        for rule in self.rules:
+            mask = rule.mask(df)
+            joined = text.where(text == '', text + separator) + rule.message
+            text = text.where(~mask, joined)
+        return text
+
+# Shared by the app, the batch scorer and the scoring service
+advice_engine = AdviceEngine()
+
+def generate_advice(user_input, engine=advice_engine):
+    """
+    Generate loan approval improvement tips based on user input.
+
+    Args:
+        user_input (dict): Form input provided by user.
+        engine (AdviceEngine): Rules to apply (defaults to src/assets/advice_rules.json).
+
+    Returns:
+        list: List of advice strings.
+    """
+    return engine.advise(user_input)
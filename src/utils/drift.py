@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.data_processing.preprocessing import NUMERIC_COLUMNS, CATEGORICAL_COLUMNS
+from src.utils.instrumentation import metrics
+
+DRIFT_REFERENCE_FILENAME = 'drift_reference.json'
+# Inner bin edges of the output probability histogram (0-100 scale)
+PROBABILITY_EDGES = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0, 90.0]
+# Conventional PSI bands: below 0.1 stable, up to 0.25 moderate shift, above significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+def _numeric_edges(values, n_bins):
+    quantiles = np.nanquantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]) if np.isfinite(values).any() else []
+    return sorted(set(float(edge) for edge in quantiles))
+
+def _numeric_counts(values, edges):
+    """
+    Histogram with len(edges) + 1 bins (bin i holds edges[i-1] < x <= edges[i]) plus a trailing missing bin.
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    missing = np.isnan(values)
+    counts = np.bincount(np.searchsorted(edges, values[~missing], side='left'), minlength=len(edges) + 1)
+    return counts.tolist() + [int(missing.sum())]
+
+def _category_counts(values, categories):
+    """
+    Counts per known category, then unseen categories, then missing values.
+    """
+    values = pd.Series(values)
+    missing = values.isna()
+    observed = values[~missing].astype(str).value_counts()
+    counts = [int(observed.get(category, 0)) for category in categories]
+    return counts + [int(observed.sum()) - sum(counts), int(missing.sum())]
+
+def build_reference_profile(df, probabilities, n_bins=10):
+    """
+    Profiles the training data the drift monitor compares live traffic against.
+
+    Numeric features get quantile bin edges (about n_bins equally populated bins),
+    categorical features their category vocabulary; every feature also counts
+    missing values. Output probabilities use fixed 10-point bins per model.
+
+    Args:
+        df (pd.DataFrame): Raw training rows (as loaded from data/raw/credit.csv).
+        probabilities (dict): Model key to held-out probabilities on the 0-100 scale.
+        n_bins (int): Number of quantile bins per numeric feature.
+
+    Returns:
+        dict: JSON-serializable profile with 'features' and 'outputs'.
+    """
+    features = {}
+    for column in NUMERIC_COLUMNS:
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        edges = _numeric_edges(values, n_bins)
+        features[column] = {'type': 'numeric', 'edges': edges, 'counts': _numeric_counts(values, edges)}
+    for column in CATEGORICAL_COLUMNS:
+        categories = sorted(df[column].dropna().astype(str).unique().tolist())
+        features[column] = {'type': 'categorical', 'categories': categories,
+                             'counts': _category_counts(df[column], categories)}
+    outputs = {key: {'type': 'numeric', 'edges': PROBABILITY_EDGES,
+                     'counts': _numeric_counts(np.asarray(values, dtype=float), PROBABILITY_EDGES)}
+               for key, values in probabilities.items()}
+    return {'rows': int(len(df)), 'features': features, 'outputs': outputs}
+
+def population_stability_index(expected, actual, epsilon=1e-4):
+    """
+    PSI between two histograms over the same bins; empty bins are floored at epsilon.
+    """
+    expected = np.maximum(np.asarray(expected, dtype=float) / max(sum(expected), 1), epsilon)
+    actual = np.maximum(np.asarray(actual, dtype=float) / max(sum(actual), 1), epsilon)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def binned_ks(expected, actual):
+    """
+    Kolmogorov-Smirnov distance between two histograms over the same ordered bins.
+
+    Only the bin boundaries are compared, so this is a lower bound of the KS
+    statistic of the underlying samples.
+    """
+    expected = np.cumsum(expected) / max(sum(expected), 1)
+    actual = np.cumsum(actual) / max(sum(actual), 1)
+    return float(np.max(np.abs(expected - actual)))
+
+def _as_float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+class DriftMonitor:
+    """
+    Streaming sketches of live inputs and output probabilities, compared against the training profile.
+
+    Each numeric feature keeps a fixed-bin histogram on the reference quantile
+    edges and each categorical feature a count per training category (plus unseen
+    and missing), so memory is constant whatever the traffic. Recording one
+    applicant is a bisect or dict lookup per feature under one lock. Comparison
+    (PSI and binned KS per feature) only happens in report(), which the background
+    flusher calls periodically before writing a snapshot.
+
+    The reference profile comes from the current bundle's drift_reference.json.
+    Without one (models trained before the profile existed) recording is a no-op.
+    When a new bundle brings a new profile the sketches start over.
+    """
+
+    def __init__(self, reference_loader=None, min_samples=50):
+        self._reference_loader = reference_loader or _load_current_reference
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._reference = None
+        self._loaded = False
+        self._flusher = None
+        self._numeric = []
+        self._categorical = []
+        self._outputs = {}
+        self.observed = 0
+        self.started_at = None
+
+    def refresh(self):
+        """
+        Reloads the reference profile; resets the sketches when it changed.
+
+        Returns:
+            bool: True when a reference profile is available.
+        """
+        try:
+            reference = self._reference_loader()
+        except FileNotFoundError:
+            reference = None
+        except Exception as e:
+            logging.warning("Failed to load drift reference profile: %s", e)
+            reference = self._reference
+        with self._lock:
+            self._loaded = True
+            if reference is not self._reference:
+                self._reset(reference)
+        return self._reference is not None
+
+    def _reset(self, reference):
+        self._reference = reference
+        self.observed = 0
+        self.started_at = time.time()
+        features = (reference or {}).get('features', {})
+        self._numeric = [(column, spec['edges'], [0] * (len(spec['edges']) + 2))
+                         for column, spec in features.items() if spec['type'] == 'numeric']
+        self._categorical = [(column, {category: i for i, category in enumerate(spec['categories'])},
+                              [0] * (len(spec['categories']) + 2))
+                             for column, spec in features.items() if spec['type'] == 'categorical']
+        self._outputs = {}
+
+    def _output_counts(self, model_key):
+        counts = self._outputs.get(model_key)
+        if counts is None:
+            counts = self._outputs[model_key] = [0] * (len(PROBABILITY_EDGES) + 2)
+        return counts
+
+    def observe(self, user_input, probability, model_key):
+        """
+        Records one applicant dict and its probability (0-100 scale).
+        """
+        if not self._loaded:
+            self.refresh()
+        if self._reference is None:
+            return
+        with self._lock:
+            for column, edges, counts in self._numeric:
+                value = _as_float(user_input.get(column))
+                counts[-1 if value is None else bisect.bisect_left(edges, value)] += 1
+            for column, index, counts in self._categorical:
+                value = user_input.get(column)
+                if value is None or value != value:
+                    counts[-1] += 1
+                else:
+                    counts[index.get(str(value), -2)] += 1
+            output = self._output_counts(model_key)
+            output[bisect.bisect_left(PROBABILITY_EDGES, probability)] += 1
+            self.observed += 1
+
+    def observe_batch(self, df, probabilities, model_key):
+        """
+        Records many applicant rows and their probabilities (0-100 scale) in one vectorized pass.
+        """
+        if not self._loaded:
+            self.refresh()
+        if self._reference is None or len(df) == 0:
+            return
+        # Histogram the batch outside the lock, then add it to the sketches it was binned for
+        numeric, categorical = self._numeric, self._categorical
+        batches = [_numeric_counts(df[column] if column in df else np.full(len(df), np.nan), edges)
+                   for column, edges, _ in numeric]
+        batches += [_category_counts(df[column] if column in df else pd.Series([None] * len(df)), list(index))
+                    for column, index, _ in categorical]
+        output = _numeric_counts(np.asarray(probabilities, dtype=float), PROBABILITY_EDGES)
+        with self._lock:
+            if numeric is not self._numeric:
+                return
+            for (_, _, counts), batch in zip(numeric + categorical, batches):
+                for i, count in enumerate(batch):
+                    counts[i] += count
+            counts = self._output_counts(model_key)
+            for i, count in enumerate(output):
+                counts[i] += count
+            self.observed += len(df)
+
+    def report(self):
+        """
+        Compares the sketches with the reference profile.
+
+        Returns:
+            dict: Per feature and per model output the observed count, PSI, binned KS (numeric
+                only) and a status of 'stable', 'moderate', 'significant' or 'insufficient_data'.
+        """
+        with self._lock:
+            reference = self._reference
+            sketches = {column: list(counts) for column, _, counts in self._numeric + self._categorical}
+            outputs = {key: list(counts) for key, counts in self._outputs.items()}
+            observed = self.observed
+        if reference is None:
+            return {'status': 'no_reference'}
+
+        def compare(spec, counts):
+            entry = {'observed': sum(counts), 'psi': population_stability_index(spec['counts'], counts)}
+            if spec['type'] == 'numeric':
+                # The trailing missing bin is not part of the ordered distribution
+                entry['ks'] = binned_ks(spec['counts'][:-1], counts[:-1])
+            if entry['observed'] < self.min_samples:
+                entry['status'] = 'insufficient_data'
+            else:
+                entry['status'] = ('significant' if entry['psi'] > PSI_SIGNIFICANT else
+                                   'moderate' if entry['psi'] > PSI_MODERATE else 'stable')
+            return entry
+
+        return {
+            'observed': observed,
+            'since': self.started_at,
+            'features': {column: compare(reference['features'][column], counts) for column, counts in sketches.items()},
+            'outputs': {key: compare(reference['outputs'][key], counts)
+                        for key, counts in outputs.items() if key in reference.get('outputs', {})},
+        }
+
+    def snapshot(self):
+        """
+        Returns the raw sketches next to the drift report.
+        """
+        with self._lock:
+            sketches = {column: list(counts) for column, _, counts in self._numeric + self._categorical}
+            outputs = {key: list(counts) for key, counts in self._outputs.items()}
+        return {'written_at': time.time(), 'report': self.report(),
+                'sketches': {'features': sketches, 'outputs': outputs}}
+
+    def flush(self, path):
+        """
+        Atomically writes a snapshot as JSON and logs features with significant drift.
+        """
+        snapshot = self.snapshot()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(path + '.tmp', path)
+
+        report = snapshot['report']
+        for group in ('features', 'outputs'):
+            for name, entry in report.get(group, {}).items():
+                if entry['status'] == 'significant':
+                    logging.warning("Significant drift in %s (PSI %.3f over %d observations)",
+                                    name, entry['psi'], entry['observed'])
+                metrics.increment('loan_drift_checks_total', status=entry['status'])
+        return snapshot
+
+    def start_flusher(self, path, interval_seconds=60):
+        """
+        Refreshes the reference and flushes a snapshot every interval from a daemon thread; idempotent per process.
+        """
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, args=(path, interval_seconds),
+                                             name='drift-flusher', daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self, path, interval_seconds):
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                self.refresh()
+                self.flush(path)
+            except Exception as e:
+                # Any error escaping here would end the daemon thread and every later flush
+                logging.warning("Failed to flush drift snapshot to %s: %s", path, e)
+
+def _load_current_reference():
+    # Imported here so the prediction path does not pull in the registry's dependencies
+    from src.models.registry import registry
+
+    def load_json(path):
+        with open(path) as f:
+            return json.load(f)
+
+    return registry.get(DRIFT_REFERENCE_FILENAME, loader=load_json)
+
+# Shared by every module in the process
+drift_monitor = DriftMonitor()
@@ -1,51 +1,181 @@
-import shap
+import threading
+
+import numpy as np
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
 
-# Not used in the current code but kept for potential future use
-def explain_prediction(model, user_processed, background_data=None):
+from src.models.registry import registry
+
+BACKGROUND_FILENAME = 'background_data.csv'
+
+class LinearExplainer:
     """
-    Explains the individual prediction using SHAP values.
+    Exact SHAP values for a linear model in log-odds space.
+
+    With independent features the contribution of feature j is
+    coef_j * (x_j - mean of x_j over the background data), so no sampling is needed
+    and a whole batch is explained with one matrix operation.
+    """
+
+    def __init__(self, model, background_data):
+        self.coef = model.coef_[0]
+        self.background_mean = np.asarray(background_data, dtype=float).mean(axis=0)
+        self.expected_value = float(self.background_mean @ self.coef + model.intercept_[0])
+
+    def shap_values(self, X):
+        return (np.asarray(X, dtype=float) - self.background_mean) * self.coef
+
+class TreeExplainer:
+    """
+    Wraps shap.TreeExplainer and returns the contributions towards approval (class 1).
+    """
+
+    def __init__(self, model, background_data):
+        import shap
+        self._explainer = shap.TreeExplainer(model, background_data)
+        self._positive_index = list(model.classes_).index(1)
+        expected_value = np.atleast_1d(self._explainer.expected_value)
+        self.expected_value = float(expected_value[self._positive_index if expected_value.size > 1 else 0])
+
+    def shap_values(self, X):
+        shap_values = self._explainer.shap_values(np.asarray(X, dtype=float), check_additivity=False)
+        if isinstance(shap_values, list):
+            return shap_values[self._positive_index]
+        if shap_values.ndim == 3:
+            return shap_values[:, :, self._positive_index]
+        return shap_values
+
+class CompiledForestExplainer(TreeExplainer):
+    """
+    Exact SHAP values for a CompiledRandomForest, such as the compacted forest, which has no pickle.
+
+    Each tree's slice of the node arrays is handed to shap.TreeExplainer as a custom tree,
+    with leaf values divided by the tree count so the trees sum to the forest's probability.
+    The thresholds live in scaled space, like the background data.
+    """
+
+    def __init__(self, model, background_data):
+        import shap
+        ends = np.append(model.roots[1:], model.left.size)
+        trees = []
+        for root, end in zip(model.roots, ends):
+            left = model.left[root:end].astype(np.int64)
+            right = model.right[root:end].astype(np.int64)
+            is_leaf = left == -1
+            left = np.where(is_leaf, -1, left - root)
+            trees.append({
+                'children_left': left,
+                'children_right': np.where(is_leaf, -1, right - root),
+                'children_default': left,
+                'features': np.where(is_leaf, -2, model.feature[root:end]).astype(np.int64),
+                'thresholds': model.threshold[root:end].astype(np.float64),
+                'values': (model.value[root:end].astype(np.float64) / model.roots.size).reshape(-1, 1),
+                # Only used without background data (path-dependent mode)
+                'node_sample_weight': np.ones(end - root),
+            })
+        self._explainer = shap.TreeExplainer({'trees': trees, 'base_offset': 0.0}, background_data)
+        self._positive_index = 0
+        self.expected_value = float(np.atleast_1d(self._explainer.expected_value)[0])
+
+def build_explainer(model, background_data):
+    """
+    Builds the fastest exact explainer available for the model.
 
     Args:
         model: Trained model.
-        user_processed: Preprocessed (but not scaled) user input DataFrame.
-        background_data: Background data for SHAP TreeExplainer (for Random Forest only).
+        background_data: Scaled background sample the contributions are measured against.
 
     Returns:
-        pd.DataFrame: Top 3 feature contributions sorted by absolute impact.
+        LinearExplainer, TreeExplainer or CompiledForestExplainer
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.ensemble import RandomForestClassifier
+    from src.models.compiled import CompiledRandomForest
+
+    if isinstance(model, LogisticRegression):
+        return LinearExplainer(model, background_data)
+    if isinstance(model, RandomForestClassifier):
+        if background_data is None:
+            raise ValueError("Background data is required for explaining Random Forest!")
+        return TreeExplainer(model, background_data)
+    if isinstance(model, CompiledRandomForest):
+        if background_data is None:
+            raise ValueError("Background data is required for explaining a compiled Random Forest!")
+        return CompiledForestExplainer(model, background_data)
+    raise ValueError("Unsupported model type for SHAP explanations.")
+
+_explainers = {}
+_explainers_lock = threading.Lock()
+
+def explained_model(model_key, artifacts=registry):
+    """
+    Returns the model the explanations of model_key are computed on: its pickle, or its
+    compiled arrays for models saved only in that form (the compacted forest).
     """
     try:
-        feature_names = user_processed.columns.tolist()
-        
-        if isinstance(model, LogisticRegression):
-            explainer = shap.Explainer(model.predict, masker=user_processed)
-            shap_values = explainer(user_processed)
-            shap_contributions = shap_values.values[0]
+        return artifacts.model(model_key)
+    except FileNotFoundError:
+        return artifacts.scoring_model(model_key)
+
+def get_explainer(model_key, artifacts=registry):
+    """
+    Returns the explainer for a saved model, built once per loaded model.
 
-        elif isinstance(model, RandomForestClassifier):
-            if background_data is None:
-                raise ValueError("Background data is required for explaining Random Forest!")
+    The explainer is rebuilt only when the registry hands back a different model or
+    background object, i.e. after the files were retrained.
+    """
+    model = explained_model(model_key, artifacts)
+    background_data = artifacts.get(BACKGROUND_FILENAME, loader=pd.read_csv)
+    with _explainers_lock:
+        cached = _explainers.get(model_key)
+        if cached is not None and cached[0] is model and cached[1] is background_data:
+            return cached[2]
+        explainer = build_explainer(model, background_data)
+        _explainers[model_key] = (model, background_data, explainer)
+        return explainer
+
+def explain_batch(explainer, X_scaled, feature_names):
+    """
+    Explains many rows in a single vectorized call.
 
-            explainer = shap.TreeExplainer(model, background_data)
+    Args:
+        explainer: Explainer from build_explainer or get_explainer.
+        X_scaled: Scaled feature matrix, one row per applicant.
+        feature_names (list): Column names of X_scaled.
 
-            shap_values = explainer.shap_values(user_processed)
+    Returns:
+        pd.DataFrame: One row of feature contributions per applicant.
+    """
+    return pd.DataFrame(explainer.shap_values(X_scaled), columns=feature_names)
 
-            if isinstance(shap_values, list) and len(shap_values) > 1:
-                shap_contributions = shap_values[1][0]
-            else:
-                shap_contributions = shap_values[0][0]
+def explain_prediction(model, user_processed, background_data=None, scaler=None, explainer=None, top_n=3):
+    """
+    Explains the individual prediction using SHAP values.
+
+    Args:
+        model: Trained model.
+        user_processed: Preprocessed (but not scaled) user input DataFrame.
+        background_data: Scaled background data, needed when no explainer is given.
+        scaler: Fitted scaler; the model and background data live in scaled space.
+        explainer: Cached explainer for the model (see get_explainer).
+        top_n (int): Number of features to return.
+
+    Returns:
+        pd.DataFrame: Top feature contributions sorted by absolute impact.
+    """
+    try:
+        feature_names = user_processed.columns.tolist()
+        X_scaled = scaler.transform(user_processed) if scaler is not None else user_processed
 
-        else:
-            raise ValueError("Unsupported model type for SHAP explanations.")
+        if explainer is None:
+            explainer = build_explainer(model, background_data)
+        shap_contributions = explain_batch(explainer, X_scaled, feature_names).iloc[0].to_numpy()
 
         shap_df = pd.DataFrame({
             'feature': feature_names,
             'contribution': shap_contributions
         }).sort_values(by='contribution', key=abs, ascending=False)
 
-        top_features = shap_df.head(3)
+        top_features = shap_df.head(top_n)
         return top_features
 
     except Exception as e:
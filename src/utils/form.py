@@ -2,6 +2,19 @@ import streamlit as st
 import os
 import json
 
+from src.utils.interpretation import interpret_probability  # re-exported for app.py
+
+# Display name to model key; the compact forest only exists as a compiled NumPy model,
+# gradient boosting takes the raw categoricals (src/models/boosting.py) and the ensemble
+# averages the other models with weights from training (src/models/ensemble.py)
+MODEL_CHOICES = {
+    "Logistic Regression (Recommended)": "logistic_regression",
+    "Random Forest": "random_forest",
+    "Random Forest (Compact)": "random_forest_compact",
+    "Gradient Boosting (Native Categoricals)": "hist_gradient_boosting",
+    "Ensemble": "ensemble",
+}
+
 def fetch_input():
     """
     Renders a loan application form in the Streamlit UI and collects user input.
@@ -57,43 +70,20 @@ def fetch_input():
         }
     return None
 
-def interpret_probability(probability):
-    """
-    Returns interpretation text and associated color based on the loan approval probability.
-
-    Args:
-        probability (float): Loan approval probability in percentage.
-
-    Returns:
-        tuple: (interpretation_text, color_code)
-    """
-    if probability >= 80:
-        return "Very Likely", "green"
-    elif probability >= 60:
-        return "Likely", "limegreen"
-    elif probability >= 40:
-        return "Somewhat Likely", "yellow"
-    elif probability >= 20:
-        return "Unlikely", "orange"
-    else:
-        return "Very Unlikely", "red"
-
 def model_selector():
     """
     Renders a model selection dropdown and returns the selected model key.
 
     Returns:
-        str: Model key ('logistic_regression' or 'random_forest')
+        str: Model key ('logistic_regression', 'random_forest', 'random_forest_compact',
+            'hist_gradient_boosting' or 'ensemble')
     """
     model_choice = st.selectbox(
     "Choose your prediction model:",
-    ("Logistic Regression (Recommended)", "Random Forest")
+    tuple(MODEL_CHOICES)
     )
 
-    if model_choice.startswith("Logistic"):
-        return "logistic_regression"
-    else:
-        return "random_forest"
+    return MODEL_CHOICES[model_choice]
 
 def display_model_info(metrics_path):
     """
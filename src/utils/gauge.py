@@ -1,10 +1,11 @@
-import plotly.graph_objects as go
-
 def generate_gauge_chart(probability, interpretation, color):
     """
     Returns a customized Plotly gauge chart visualizing the loan approval probability
     with an arrow-like pointer to highlight the current value.
     """
+    # plotly is only needed once a chart is drawn, so it stays out of the app's import path
+    import plotly.graph_objects as go
+
     return go.Figure(go.Indicator(
         mode="gauge+number",
         value=probability,
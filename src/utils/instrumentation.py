@@ -0,0 +1,148 @@
+import os
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_METRIC = 'loan_stage_duration_seconds'
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+class Metrics:
+    """
+    In-process latency histograms and counters, exported in Prometheus text format.
+
+    Recording a value takes one lock and a bisect, so spans can wrap the per-request
+    hot path. Nothing is written to disk while recording; export happens on demand
+    (write_prometheus, the scoring service's /metrics) or from start_exporter's thread.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._exporter = None
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """
+        Times the enclosed block into the stage latency histogram.
+
+        Example:
+            with metrics.span('predict_proba', model='random_forest'):
+                model.predict_proba(X)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(STAGE_METRIC, time.perf_counter() - start, stage=stage, **labels)
+
+    def observe(self, name, value, **labels):
+        """
+        Adds one observation to a histogram.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            entry = series.get(_label_key(labels))
+            if entry is None:
+                entry = series[_label_key(labels)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def increment(self, name, value=1, **labels):
+        """
+        Adds to a counter.
+        """
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def snapshot(self):
+        """
+        Returns count, total and mean seconds of every stage span recorded so far.
+        """
+        with self._lock:
+            stages = self._histograms.get(STAGE_METRIC, {})
+            return {
+                ','.join(f'{name}={value}' for name, value in key):
+                    {'count': count, 'total_seconds': total, 'mean_seconds': total / count}
+                for key, (_, total, count) in stages.items() if count
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_prometheus(self):
+        """
+        Renders every metric in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f'# TYPE {name} counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f'{name}{_format_labels(key)} {value}')
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f'# TYPE {name} histogram')
+                for key, (counts, total, count) in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                        cumulative += bucket_count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{name}_bucket{_format_labels(key, [("le", le)])} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {total}')
+                    lines.append(f'{name}_count{_format_labels(key)} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """
+        Atomically writes the Prometheus text to a file (e.g. for node_exporter's textfile collector).
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(path + '.tmp', path)
+
+    def start_exporter(self, path, interval_seconds=15):
+        """
+        Rewrites the Prometheus file every interval from a daemon thread; idempotent per process.
+        """
+        with self._lock:
+            if self._exporter is not None:
+                return
+            self._exporter = threading.Thread(target=self._export_loop, args=(path, interval_seconds),
+                                              name='metrics-exporter', daemon=True)
+        self._exporter.start()
+
+    def _export_loop(self, path, interval_seconds):
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                self.write_prometheus(path)
+            except Exception as e:
+                # Any error escaping here would end the daemon thread and every later export
+                logging.warning("Failed to export metrics to %s: %s", path, e)
+
+# Shared by every module in the process
+metrics = Metrics()
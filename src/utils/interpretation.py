@@ -0,0 +1,104 @@
+import json
+import os
+
+import numpy as np
+
+# Lower bound (inclusive) of each band, with its interpretation text and color
+PROBABILITY_BANDS = [
+    (80, "Very Likely", "green"),
+    (60, "Likely", "limegreen"),
+    (40, "Somewhat Likely", "yellow"),
+    (20, "Unlikely", "orange"),
+    (0, "Very Unlikely", "red"),
+]
+
+def interpret_probability(probability, bands=PROBABILITY_BANDS):
+    """
+    Returns interpretation text and associated color based on the loan approval probability.
+
+    Args:
+        probability (float): Loan approval probability in percentage.
+        bands (list): (lower bound, text, color) tuples, highest first.
+
+    Returns:
+        tuple: (interpretation_text, color_code)
+    """
+    for lower, interpretation, color in bands:
+        if probability >= lower:
+            return interpretation, color
+    return bands[-1][1], bands[-1][2]
+
+def interpret_probabilities(probabilities, bands=PROBABILITY_BANDS):
+    """
+    Vectorized version of interpret_probability for an array of probabilities.
+
+    Args:
+        probabilities (array-like): Loan approval probabilities in percentage.
+        bands (list): (lower bound, text, color) tuples, highest first.
+
+    Returns:
+        np.ndarray: Interpretation text for each probability.
+    """
+    probabilities = np.asarray(probabilities, dtype=float)
+    conditions = [probabilities >= lower for lower, _, _ in bands[:-1]]
+    choices = [interpretation for _, interpretation, _ in bands[:-1]]
+    return np.select(conditions, choices, default=bands[-1][1])
+
+def bands_from_calibration(calibration, bands=PROBABILITY_BANDS):
+    """
+    Moves each band's lower bound to the model score where the observed approval rate reaches it.
+
+    The default bands read their bounds as approval rates ("Very Likely" = at least
+    80% of such applicants are approved). Using the calibration bins from
+    evaluation.threshold_analysis, each bound becomes the lower edge of the first
+    score bin whose (monotonised) observed rate reaches it, so the bands describe
+    how often the model's scores actually come true.
+
+    Args:
+        calibration (dict): 'bin_edges', 'count' and 'observed_rate' per bin.
+        bands (list): Nominal (lower bound in percent, text, color) tuples, highest first.
+
+    Returns:
+        list: Bands with lower bounds on the model's 0-100 score scale.
+    """
+    edges = np.asarray(calibration['bin_edges'][:-1], dtype=float) * 100
+    filled = np.asarray(calibration['count']) > 0
+    observed = np.array([rate for rate, n in zip(calibration['observed_rate'], calibration['count']) if n], dtype=float)
+    # Higher scores should never mean a lower approval rate; smooth out small-sample dips
+    observed = np.maximum.accumulate(observed) * 100
+    edges = edges[filled]
+
+    calibrated = []
+    for lower, interpretation, color in bands[:-1]:
+        index = np.searchsorted(observed, lower, side='left')
+        calibrated.append((float(edges[index]) if index < edges.size else 100.0, interpretation, color))
+    calibrated.append((0.0, bands[-1][1], bands[-1][2]))
+    return calibrated
+
+def load_probability_bands(metrics_path):
+    """
+    Returns the calibrated bands saved with a model's metrics, or the default bands.
+    """
+    if os.path.exists(metrics_path):
+        try:
+            with open(metrics_path) as f:
+                bands = json.load(f).get('probability_bands')
+            if bands:
+                return [tuple(band) for band in bands]
+        except (OSError, ValueError):
+            pass
+    return PROBABILITY_BANDS
+
+def load_operating_threshold(metrics_path, default=50.0):
+    """
+    Returns the operating threshold saved with a model's metrics on the 0-100 scale, or the default.
+    """
+    if os.path.exists(metrics_path):
+        try:
+            with open(metrics_path) as f:
+                operating_point = json.load(f).get('operating_point')
+            if operating_point:
+                return float(operating_point['threshold']) * 100
+        except (OSError, ValueError, KeyError):
+            pass
+    return default
@@ -0,0 +1,33 @@
+import atexit
+import queue
+import logging
+import logging.handlers
+
+LOG_FILE = 'loan_app.log'
+LOG_FORMAT = '%(asctime)s %(levelname)s %(message)s'
+
+_listener = None
+
+def configure_logging(filename=LOG_FILE, level=logging.INFO):
+    """
+    Configures the root logger once for the entry points (app, training, scoring, service).
+
+    Records are put on an in-memory queue and written to the log file by a
+    background listener thread, so disk I/O never blocks the calling thread.
+    Library modules only log; they do not configure logging themselves.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
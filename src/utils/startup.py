@@ -0,0 +1,142 @@
+import ast
+import json
+import subprocess
+import sys
+import time
+
+from src.config import TIME_TO_FIRST_PREDICTION_TARGET_S
+
+SAMPLE_APPLICANT = {
+    'Gender': 'Male', 'Married': 'Yes', 'Dependents': '0', 'Education': 'Graduate', 'Self_Employed': 'No',
+    'ApplicantIncome': 4000, 'CoapplicantIncome': 1500, 'LoanAmount': 120, 'Loan_Amount_Term': '360',
+    'Credit_History': '1.0', 'Property_Area': 'Urban'
+}
+
+# Runs in a fresh interpreter: imports the app's modules one by one, loads the artifacts
+# through the registry, serves one prediction and prints the phase timings as JSON.
+_STARTUP_SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+report = {'modules': {}, 'missing': [], 'artifacts': {}}
+for name in %(modules)r:
+    t = time.perf_counter()
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        report['missing'].append(name)
+        continue
+    report['modules'][name] = time.perf_counter() - t
+report['import_seconds'] = time.perf_counter() - start
+
+from src.models.cache import cached_predict
+from src.models.registry import registry
+for name, load in [('preprocessor', registry.preprocessor),
+                   ('%(model_key)s', lambda: registry.scoring_model('%(model_key)s'))]:
+    t = time.perf_counter()
+    load()
+    report['artifacts'][name] = time.perf_counter() - t
+
+t = time.perf_counter()
+cached_predict(%(applicant)r, '%(model_key)s')
+report['predict_seconds'] = time.perf_counter() - t
+report['sklearn_imported'] = 'sklearn' in sys.modules
+report['in_process_seconds'] = time.perf_counter() - start
+print(json.dumps(report))
+"""
+
+def app_modules(app_path='app.py'):
+    """
+    Returns the modules app.py imports at top level (before it can serve its first
+    prediction), in import order.
+
+    They are read from the app's source, so the report follows the app as imports are added.
+    """
+    with open(app_path) as f:
+        tree = ast.parse(f.read(), filename=app_path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        modules += [name for name in names if name not in modules]
+    return modules
+
+def _parse_importtime(stderr, top=15):
+    """
+    Sums the cumulative `-X importtime` cost of each top-level package.
+
+    Returns:
+        dict: Package name to seconds, most expensive first.
+    """
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented; only count the outermost one of each chain
+        if name.startswith('  '):
+            continue
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0.0) + int(cumulative) / 1e6
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return dict(ranked[:top])
+
+def startup_report(model_key='logistic_regression', target_seconds=TIME_TO_FIRST_PREDICTION_TARGET_S, repeats=3,
+                   app_path='app.py'):
+    """
+    Measures what a cold start of the app costs, from interpreter launch to the first prediction.
+
+    Each run is a fresh Python process, so nothing is shared with the caller's imports.
+    The time-to-first-prediction is the best wall clock over `repeats` plain runs; one
+    extra run with `-X importtime` attributes the import cost to top-level packages.
+
+    Args:
+        model_key (str): Model served for the first prediction.
+        target_seconds (float): Time-to-first-prediction target.
+        repeats (int): Number of timed cold starts.
+        app_path (str): The app whose top-level imports are timed (see app_modules).
+
+    Returns:
+        dict: Per-module import seconds, per-package import seconds, artifact load seconds,
+            the time to first prediction and whether it meets the target.
+    """
+    script = _STARTUP_SCRIPT % {'modules': app_modules(app_path), 'model_key': model_key, 'applicant': SAMPLE_APPLICANT}
+
+    wall_clock = []
+    report = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'startup run failed')
+        wall_clock.append(time.perf_counter() - start)
+        report = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    profiled = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], capture_output=True, text=True)
+    report['packages'] = _parse_importtime(profiled.stderr)
+
+    report['time_to_first_prediction_seconds'] = min(wall_clock)
+    report['target_seconds'] = target_seconds
+    report['meets_target'] = report['time_to_first_prediction_seconds'] <= target_seconds
+    return report
+
+def format_startup_report(report):
+    """
+    Renders a startup report as a plain-text table.
+    """
+    lines = ["Imports (in app order, cumulative per module):"]
+    lines += [f"  {name:<28} {seconds * 1000:8.1f} ms" for name, seconds in report['modules'].items()]
+    lines += [f"  {name:<28} {'missing':>8}" for name in report['missing']]
+    lines.append("Imports by top-level package:")
+    lines += [f"  {name:<28} {seconds * 1000:8.1f} ms" for name, seconds in report['packages'].items()]
+    lines.append("Artifact loads:")
+    lines += [f"  {name:<28} {seconds * 1000:8.1f} ms" for name, seconds in report['artifacts'].items()]
+    lines.append(f"First prediction:              {report['predict_seconds'] * 1000:8.1f} ms")
+    lines.append(f"scikit-learn imported:         {report['sklearn_imported']}")
+    status = 'OK' if report['meets_target'] else 'MISSED'
+    lines.append(f"Time to first prediction:      {report['time_to_first_prediction_seconds']:.2f} s "
+                 f"(target {report['target_seconds']:.2f} s, {status})")
+    return "\n".join(lines)
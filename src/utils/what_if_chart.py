@@ -0,0 +1,40 @@
+def generate_what_if_chart(result, x='LoanAmount', y='ApplicantIncome'):
+    """
+    Returns a Plotly heatmap of the approval probability over two what-if features,
+    with the other features at the applicant's values, the target threshold drawn
+    as a contour line and the applicant marked.
+
+    Args:
+        result (dict): Output of src.models.what_if.what_if_analysis.
+        x (str): Feature on the horizontal axis.
+        y (str): Feature on the vertical axis.
+    """
+    import plotly.graph_objects as go
+
+    applicant = result['applicant']
+    plane = result['surface']
+    for feature, value in applicant.items():
+        if feature not in (x, y):
+            plane = plane[plane[feature] == value]
+    z = plane.pivot_table(index=y, columns=x, values='probability')
+
+    figure = go.Figure()
+    figure.add_trace(go.Heatmap(
+        x=z.columns, y=z.index, z=z.to_numpy(), zmin=0, zmax=100, colorscale='RdYlGn',
+        colorbar={'title': 'Approval %'},
+        hovertemplate=f"{x}: %{{x}}<br>{y}: %{{y}}<br>Probability: %{{z:.1f}}%<extra></extra>",
+    ))
+    figure.add_trace(go.Contour(
+        x=z.columns, y=z.index, z=z.to_numpy(), showscale=False, hoverinfo='skip',
+        contours={'start': result['target'], 'end': result['target'], 'size': 1, 'coloring': 'none'},
+        line={'color': 'black', 'width': 2, 'dash': 'dash'}, name=f"{result['target']:.0f}% target",
+    ))
+    figure.add_trace(go.Scatter(
+        x=[applicant[x]], y=[applicant[y]], mode='markers', name='Applicant',
+        marker={'symbol': 'x', 'size': 14, 'color': 'black'},
+    ))
+    figure.update_layout(
+        title={'text': f"<b>What-if</b><br>{x} vs {y}", 'font': {'size': 20}},
+        xaxis_title=x, yaxis_title=y, showlegend=False, margin={'t': 80},
+    )
+    return figure
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import shutil
+
+from src.api import server
+from src.models.registry import ArtifactRegistry
+
+APPLICANT = {
+    'Gender': 'Male', 'Married': 'Yes', 'Dependents': '0', 'Education': 'Graduate', 'Self_Employed': 'No',
+    'ApplicantIncome': 4000, 'CoapplicantIncome': 1500, 'LoanAmount': 120, 'Loan_Amount_Term': 360,
+    'Credit_History': 1.0, 'Property_Area': 'Urban'
+}
+
+
+def test_retrained_model_invalidates_cached_prediction(tmp_path, monkeypatch):
+    shutil.copytree('models', tmp_path / 'models', ignore=shutil.ignore_patterns('bundles', 'CURRENT'))
+    artifacts = ArtifactRegistry(root=str(tmp_path / 'models'))
+    monkeypatch.setattr(server, 'registry', artifacts)
+    meta_path = tmp_path / 'models' / 'logistic_regression_compiled' / 'meta.json'
+
+    async def run():
+        service = server.ScoringService()
+        batcher = service.batchers['logistic_regression']
+        batcher.start()
+        try:
+            first = await service.predict(dict(APPLICANT))
+            cached = await service.predict(dict(APPLICANT))
+            assert batcher.requests == 1
+
+            # Same content with a new mtime, as after train_model.py rewrites the export
+            stat = os.stat(meta_path)
+            os.utime(meta_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            retrained = await service.predict(dict(APPLICANT))
+        finally:
+            await batcher.stop()
+        return first, cached, retrained, batcher.requests
+
+    first, cached, retrained, requests = asyncio.run(run())
+    assert first[0] == cached[0] == retrained[0] == 200
+    assert artifacts.reloads == 1
+    assert requests == 2
+    assert retrained[1]['probability'] == first[1]['probability']
+
+
+def test_invalid_content_length_is_a_bad_request():
+    async def run(content_length):
+        reader = asyncio.StreamReader()
+        reader.feed_data(f'POST /predict HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n{{}}'.encode())
+        reader.feed_eof()
+        return await server.ScoringService()._handle_request(reader)
+
+    for content_length in ('abc', '-5'):
+        status, body = asyncio.run(run(content_length))
+        assert status == 400
+        assert body == {'error': 'Invalid Content-Length header'}
+
+
+def test_non_numeric_field_is_a_bad_request():
+    service = server.ScoringService()
+    for value in ('abc', None, 'nan', [1]):
+        status, body = asyncio.run(service.predict(dict(APPLICANT, LoanAmount=value)))
+        assert status == 400
+        assert 'LoanAmount' in body['error']
+
+
+def test_non_finite_probability_is_not_cached(monkeypatch):
+    service = server.ScoringService()
+
+    async def submit(user_input):
+        return float('nan')
+
+    monkeypatch.setattr(service.batchers['logistic_regression'], 'submit', submit)
+    status, _ = asyncio.run(service.predict(dict(APPLICANT, ApplicantIncome='4000')))
+    assert status == 500
+    assert service.cache.stats()['size'] == 0
@@ -1,68 +1,379 @@
+import argparse
 import logging
 import json
+import os
 import pandas as pd
-from src.config import RAW_PATH, PROCESSED_PATH
+import sklearn
+from sklearn.metrics import accuracy_score
+from src.config import RAW_PATH, PROCESSED_PATH, PROCESSED_DIR, TRAINING_METRICS_PATH, STAGE_CACHE_MAX_BYTES
+from src.data_processing import data_loader, preprocessing, features
 from src.data_processing.data_loader import load_data
-from src.data_processing.preprocessing import preprocess_data
-from src.data_processing.features import split_and_scale_train_test
-from src.models.training import train_random_forest, train_logistic_regression
-from src.models.evaluation import evaluate_model
-from src.models.storage import save_models
+from src.data_processing.preprocessing import preprocess_data, Preprocessor
+from src.data_processing.features import split_and_scale_train_test, split_raw_train_test
+from src.data_processing.columnar import save_processed_columnar, load_processed_columnar, read_manifest
+from src.models import training, evaluation, compaction, compiled, boosting, ensemble, storage
+from src.models.training import train_models_in_parallel, tune_hyperparameters
+from src.models.evaluation import evaluate_model, cross_validate_model, threshold_analysis
+from src.models.compaction import COMPACT_MODEL_KEY, compact_random_forest
+from src.models.boosting import HIST_GRADIENT_BOOSTING_KEY
+from src.models.ensemble import ENSEMBLE_KEY, ENSEMBLE_FILENAME, ENSEMBLE_MEMBERS, ensemble_weights
+from src.models.storage import BUNDLE_KEY_FILENAME, save_bundle, current_bundle_key
+from src.models.incremental import IncrementalTrainer
+from src.models.stage_cache import STAGES, StageCache, code_version, file_hash, stage_key
+from src.utils import drift
+from src.utils.logging_config import configure_logging
+from src.utils.interpretation import bands_from_calibration
+from src.utils.drift import DRIFT_REFERENCE_FILENAME, build_reference_profile
+from src.utils.instrumentation import metrics as stage_metrics, STAGE_METRIC
 
 # Configure logging
-logging.basicConfig(filename='loan_app.log', level=logging.INFO,
-                    format='%(asctime)s %(levelname)s %(message)s')
+configure_logging()
 
-def train_pipeline():
+MODEL_NAMES = ("random_forest", "logistic_regression", HIST_GRADIENT_BOOSTING_KEY)
+# Models with a search space in training.SEARCH_SPACES
+TUNED_MODEL_NAMES = ("random_forest", "logistic_regression")
+
+def _analysis_metrics(analysis):
+    """
+    Metrics entries from a threshold analysis; the calibration drives the app's interpretation bands.
+    """
+    operating_point = analysis["operating_point"]
+    print(f"  Operating threshold {operating_point['threshold']:.3f}: "
+          f"accuracy {operating_point['accuracy']:.2%}, ROC AUC {analysis['roc_auc']:.3f}")
+    return {
+        "roc_auc": analysis["roc_auc"],
+        "average_precision": analysis["average_precision"],
+        "operating_point": operating_point,
+        "calibration": analysis["calibration"],
+        "probability_bands": bands_from_calibration(analysis["calibration"]),
+    }
+
+def _stage_keys(tune_budget, compact_dtypes):
+    """
+    Cache keys of every stage: each hashes its upstream key, the code it runs and its parameters.
     """
-    Runs the full machine learning training pipeline:
-    - Loads raw data
-    - Preprocesses the data
-    - Splits and scales features
-    - Trains both Random Forest and Logistic Regression models
-    - Evaluates models and saves their metrics to JSON files
-    - Saves trained models, scaler, and background dataset for SHAP
+    versions = {"pandas": pd.__version__, "sklearn": sklearn.__version__}
+    keys = {"load": stage_key("load", data=file_hash(RAW_PATH), code=code_version(data_loader),
+                              compact_dtypes=compact_dtypes, **versions)}
+    keys["preprocess"] = stage_key("preprocess", upstream=keys["load"], code=code_version(preprocessing))
+    keys["split"] = stage_key("split", upstream=keys["preprocess"], code=code_version(features))
+    for name in TUNED_MODEL_NAMES:
+        keys[f"tune:{name}"] = stage_key("tune", upstream=keys["split"], model=name, budget=tune_budget,
+                                         code=code_version(training))
+    return keys
+
+def train_pipeline(worker_budget=None, tune=False, tune_budget=None, force=(), cache_max_bytes=STAGE_CACHE_MAX_BYTES,
+                   compact_dtypes=False):
+    """
+    Runs the full machine learning training pipeline as cached stages:
+    - load: Loads raw data
+    - preprocess: Preprocesses the data, fits the preprocessor and stores the dataset as CSV and as a
+      memory-mappable columnar dataset with a manifest, which the later stages read memory-mapped
+    - split: Splits and scales features, and draws the same split of the raw rows
+    - tune: Optionally tunes the Random Forest and Logistic Regression hyperparameters with successive
+      halving (tune, tune_budget seconds)
+    - train: Trains Random Forest, Logistic Regression and Histogram Gradient Boosting models concurrently
+      within worker_budget cores; gradient boosting takes the raw split, with native categoricals
+      and missing values instead of one-hot encoding, imputation and scaling
+    - evaluate: Evaluates models on the test split (ROC/PR curves, operating threshold, calibration bands)
+      and with parallel stratified cross-validation
+    - compact: Compacts the random forest (tree count, depth, float32 nodes), choosing the level on
+      out-of-bag training predictions, and reports size, latency and test accuracy per compaction level
+    - Weights a Random Forest + Logistic Regression ensemble by held-out ROC AUC and evaluates it
+    - Profiles the raw inputs and held-out probabilities as the drift monitor's reference
+    - Saves models, compiled NumPy models, scaler, fitted preprocessor, metrics, drift reference
+      and SHAP background data as a versioned bundle under models/bundles/ and makes it current
+      (skipped when every stage hit the cache and the intact current bundle was built from them)
+    - Exports the wall-clock of every step in Prometheus text format to metrics/training.prom
+
+    Each stage is keyed by a hash of the raw file content, the source of the modules it runs,
+    library versions, its parameters and its upstream keys. Unchanged stages are loaded from
+    cache/stages/ instead of recomputed (per model for tune, train and evaluate), stages in
+    `force` are always recomputed, and the least recently used entries are evicted beyond
+    cache_max_bytes. The run ends with a report of which stages hit the cache and how long each
+    took; a train stage reports its model's fit time even when models were fitted in parallel.
+
+    With compact_dtypes, the data is read with category/float32 dtypes, preprocessed into
+    uint8 dummies and float32 numerics and scaled into float32 frames (see
+    benchmark.py --memory-report for the peak memory of both modes).
     """
     try:
+        cache = StageCache(max_bytes=cache_max_bytes, force=force)
+        keys = _stage_keys(tune_budget, compact_dtypes)
+
         # Load raw dataset
-        df_raw = load_data(RAW_PATH)
+        with stage_metrics.span('load_data'):
+            df_raw = cache.run("load", keys["load"], lambda: load_data(RAW_PATH, compact=compact_dtypes))
+
+        # Preprocess and fit the preprocessor used to transform new applicants at prediction time
+        def preprocess():
+            with stage_metrics.span('preprocess_data'):
+                df = preprocess_data(df_raw, output_path=PROCESSED_PATH, compact=compact_dtypes)
+            # Store it column by column for memory-mapped reloads, with a manifest of its metadata
+            with stage_metrics.span('save_columnar'):
+                manifest = save_processed_columnar(df, PROCESSED_DIR)
+            with stage_metrics.span('fit_preprocessor'):
+                return manifest['content_hash'], Preprocessor().fit(df_raw)
+
+        # Only the preprocessor and the content hash are cached; the data itself is the columnar store
+        content_hash, preprocessor = cache.run("preprocess", keys["preprocess"], preprocess)
+        try:
+            stored_hash = read_manifest(PROCESSED_DIR)['content_hash']
+        except (OSError, ValueError, KeyError):
+            stored_hash = None
+        if stored_hash != content_hash:
+            # Removed, or overwritten by a run on other data since this entry was cached
+            content_hash, preprocessor = preprocess()
+        # Memory-mapped reload: no parsing, and pages come from the page cache on access
+        with stage_metrics.span('load_columnar'):
+            df_processed = load_processed_columnar(PROCESSED_DIR)
+        if not os.path.exists(PROCESSED_PATH):
+            os.makedirs(os.path.dirname(PROCESSED_PATH), exist_ok=True)
+            df_processed.to_csv(PROCESSED_PATH, index=False)
+
+        # Split into train/test and scale the features, with a background sample for SHAP
+        # (in scaled space, like the model inputs)
+        def split():
+            with stage_metrics.span('split_and_scale'):
+                X_train, X_test, y_train, y_test, scaler, feature_order = split_and_scale_train_test(
+                    df_processed, compact=compact_dtypes)
+            background_data = X_train.sample(n=min(100, len(X_train)), random_state=42)
+            with stage_metrics.span('split_raw'):
+                X_train_raw, X_test_raw, y_train_raw, _ = split_raw_train_test(df_raw)
+            if not (y_train_raw.to_numpy() == y_train.to_numpy()).all():
+                raise ValueError("Raw and processed splits do not hold the same rows.")
+            return X_train, X_test, y_train, y_test, scaler, feature_order, background_data, X_train_raw, X_test_raw
+
+        X_train, X_test, y_train, y_test, scaler, feature_order, background_data, X_train_raw, X_test_raw = cache.run(
+            "split", keys["split"], split)
+        if feature_order != preprocessor.feature_names_:
+            raise ValueError("Preprocessor feature order does not match the processed dataset.")
+        # Models taking raw rows are tested and cross-validated on the raw columns, without per-fold scaling
+        test_inputs = {name: X_test for name in MODEL_NAMES}
+        test_inputs[HIST_GRADIENT_BOOSTING_KEY] = X_test_raw
+        cv_inputs = {name: (df_processed.drop('Loan_Approved', axis=1), True) for name in MODEL_NAMES}
+        cv_inputs[HIST_GRADIENT_BOOSTING_KEY] = (
+            df_raw.drop(columns=['Loan_Approved', 'Loan_ID'], errors='ignore'), False)
 
-        # Preprocess and store the processed dataset
-        df_processed = preprocess_data(df_raw, output_path=PROCESSED_PATH)
+        # Tune hyperparameters; the winning configurations are saved next to the metrics
+        params = {}
+        json_files = {}
+        if tune:
+            for name in TUNED_MODEL_NAMES:
+                with stage_metrics.span('tune', model=name):
+                    result = cache.run("tune", keys[f"tune:{name}"], lambda name=name: tune_hyperparameters(
+                        name, X_train, y_train, time_budget=tune_budget, max_workers=worker_budget),
+                        label=f"tune:{name}")
+                json_files[f"{name}_tuning.json"] = result
+                params[name] = result["params"]
+                print(f"{name.replace('_', ' ').title()} tuned config: {result['params']} "
+                      f"(cv accuracy {result['cv_accuracy']:.2%})")
 
-        # Split into train/test and scale the features
-        X_train, X_test, y_train, y_test, scaler, feature_order = split_and_scale_train_test(df_processed)
+        # Train the models whose inputs changed in parallel; the others come from the cache
+        code = code_version(training, boosting)
+        for name in MODEL_NAMES:
+            keys[f"train:{name}"] = stage_key("train", upstream=keys["split"], model=name,
+                                              params=params.get(name, {}), code=code)
+        fitted = {}
+        missing = [name for name in MODEL_NAMES if not cache.contains("train", keys[f"train:{name}"])]
+        if missing:
+            with stage_metrics.span('train_models'):
+                trained, fit_seconds = train_models_in_parallel(X_train, y_train, worker_budget=worker_budget,
+                                                                params=params, names=missing, raw_X_train=X_train_raw)
+            fitted = {name: (trained[name], fit_seconds[name]) for name in missing}
+            for name, seconds in fit_seconds.items():
+                stage_metrics.observe(STAGE_METRIC, seconds, stage='fit', model=name)
 
-        # Save background sample for SHAP
-        #background_data = X_train.sample(n=min(100, len(X_train)), random_state=42)
-        #background_data.to_csv("models/background_data.csv", index=False)
+        def fit(name):
+            # Also covers a cache entry that turned out unreadable
+            if name not in fitted:
+                trained, fit_seconds = train_models_in_parallel(X_train, y_train, worker_budget=worker_budget,
+                                                                params=params, names=[name], raw_X_train=X_train_raw)
+                fitted[name] = (trained[name], fit_seconds[name])
+            return fitted[name]
 
-        # Train both models
-        models = {
-            "random_forest": train_random_forest(X_train, y_train),
-            "logistic_regression": train_logistic_regression(X_train, y_train)
-        }
+        # Each train stage reports its model's fit time, also when it was fitted in the parallel batch above
+        models, timings = {}, {}
+        for name in MODEL_NAMES:
+            models[name], timings[name] = cache.run("train", keys[f"train:{name}"], lambda name=name: fit(name),
+                                                    label=f"train:{name}",
+                                                    prior_seconds=fitted[name][1] if name in fitted else 0.0)
 
         # Evaluate models and save metrics
         metrics = {}
+        code = code_version(evaluation)
         for name, model in models.items():
-            accuracy, _, _ = evaluate_model(model, X_test, y_test)
+            def evaluate(name=name, model=model):
+                with stage_metrics.span('evaluate', model=name):
+                    accuracy, _, _, analysis = evaluate_model(model, test_inputs[name], y_test, analysis=True)
+                # Stratified cross-validation on the full processed data, scaling fitted per fold
+                cv_X, scale = cv_inputs[name]
+                with stage_metrics.span('cross_validate', model=name):
+                    cv_results = cross_validate_model(
+                        model, cv_X, df_processed['Loan_Approved'], n_splits=5, n_jobs=worker_budget, scale=scale
+                    )
+                return accuracy, analysis, cv_results
+
+            accuracy, analysis, cv_results = cache.run(
+                "evaluate", stage_key("evaluate", upstream=keys[f"train:{name}"], code=code), evaluate,
+                label=f"evaluate:{name}")
             print(f"{name.replace('_', ' ').title()} model trained with accuracy: {accuracy:.2%}")
             metrics[name] = {"accuracy": accuracy}
-            metrics_path = f"models/{name}_metrics.json"
-            with open(metrics_path, 'w') as f:
-                json.dump(metrics[name], f)
 
-        # Save both trained models and the shared scaler
-        save_models(models, scaler, base_path="models/")
+            # ROC/PR curves, operating point and calibration from the same test-set pass;
+            # the calibration drives the app's interpretation bands
+            metrics[name].update(_analysis_metrics(analysis))
+            json_files[f"{name}_curves.json"] = analysis["curves"]
+
+            metrics[name]["cross_validation"] = {
+                "mean": cv_results["mean"], "std": cv_results["std"], "folds": cv_results["folds"]
+            }
+            if cv_results["folds"]:
+                print(f"  5-fold CV accuracy: {cv_results['mean']['accuracy']:.2%} "
+                      f"(+/- {cv_results['std']['accuracy']:.2%}), ROC AUC: {cv_results['mean']['roc_auc']:.3f}, "
+                      f"mean fit time: {cv_results['mean']['fit_time']:.2f}s")
+            json_files[f"{name}_metrics.json"] = metrics[name]
+
+        # Compact the forest (fewer/shallower trees, float32 nodes) against the test split
+        compiled_models = {}
+        if models.get("random_forest") is not None:
+            def compact():
+                with stage_metrics.span('compact_forest'):
+                    return compact_random_forest(models["random_forest"], scaler, X_train, y_train, X_test, y_test)
+
+            compact_arrays, compaction_report, compact_proba = cache.run(
+                "compact", stage_key("compact", upstream=keys["train:random_forest"],
+                                     code=code_version(compaction, compiled)), compact)
+            selected = compaction_report["selected"]
+            compiled_models[COMPACT_MODEL_KEY] = compact_arrays
+            json_files["random_forest_compaction.json"] = compaction_report
+            analysis = threshold_analysis(y_test, compact_proba)
+            json_files[f"{COMPACT_MODEL_KEY}_metrics.json"] = dict(
+                {"accuracy": selected["accuracy"], "compaction": selected}, **_analysis_metrics(analysis))
+            json_files[f"{COMPACT_MODEL_KEY}_curves.json"] = analysis["curves"]
+            print(f"Compact Random Forest: {selected['n_trees']} trees, max depth {selected['max_depth']}, "
+                  f"{selected['node_count']} nodes ({selected['array_bytes'] / 1024:.0f} KiB), "
+                  f"accuracy {selected['accuracy']:.2%}, single-row latency {selected['single_row_latency_ms']:.2f} ms")
+
+        # Weighted ensemble of the models, weights from their held-out ROC AUC, scored on the same test split
+        probabilities = {name: model.predict_proba(test_inputs[name])[:, 1] for name, model in models.items()}
+        weights = ensemble_weights({name: metrics[name] for name in ENSEMBLE_MEMBERS})
+        probabilities[ENSEMBLE_KEY] = sum(weights[name] * probabilities[name] for name in ENSEMBLE_MEMBERS)
+        analysis = threshold_analysis(y_test, probabilities[ENSEMBLE_KEY])
+        json_files[ENSEMBLE_FILENAME] = {"metric": "roc_auc", "weights": weights}
+        json_files[f"{ENSEMBLE_KEY}_metrics.json"] = dict(
+            {"accuracy": float(accuracy_score(y_test, probabilities[ENSEMBLE_KEY] >= 0.5)), "weights": weights},
+            **_analysis_metrics(analysis))
+        json_files[f"{ENSEMBLE_KEY}_curves.json"] = analysis["curves"]
+        print(f"Ensemble ({', '.join(f'{name} {weight:.2f}' for name, weight in weights.items())}) accuracy: "
+              f"{json_files[f'{ENSEMBLE_KEY}_metrics.json']['accuracy']:.2%}")
+        if compiled_models:
+            probabilities[COMPACT_MODEL_KEY] = compact_proba
+
+        # Profile of the training inputs and held-out probabilities the live drift monitor compares against
+        with stage_metrics.span('drift_reference'):
+            json_files[DRIFT_REFERENCE_FILENAME] = build_reference_profile(
+                df_raw, {name: values * 100 for name, values in probabilities.items()})
+
+        # Publish everything from this run as one bundle and switch the CURRENT pointer to it, unless
+        # every stage hit the cache and the current bundle was built from the same stages and code
+        bundle_key = stage_key("bundle", stages=[(entry["stage"], entry["key"]) for entry in cache.report],
+                               code=code_version(ensemble, drift, storage, compiled), pipeline=file_hash(__file__))
+        json_files[BUNDLE_KEY_FILENAME] = {"key": bundle_key}
+        current = current_bundle_key("models") if cache.all_hits() else None
 
         print(f"Feature order: {feature_order}")
+        if current is not None and current[1] == bundle_key:
+            print(f"Bundle {current[0]} is up to date")
+        else:
+            with stage_metrics.span('save_bundle'):
+                bundle_id = save_bundle(models, scaler, base_path="models", preprocessor=preprocessor,
+                                        json_files=json_files, background_data=background_data,
+                                        compiled_models=compiled_models)
+            print(f"Saved bundle {bundle_id} and made it current")
+
+        for name, seconds in timings.items():
+            print(f"{name.replace('_', ' ').title()} training wall-clock: {seconds:.2f}s")
+
+        # Also applies a lowered size limit on runs that only hit the cache
+        cache.evict()
+        print(cache.format_report())
+
+        stage_metrics.write_prometheus(TRAINING_METRICS_PATH)
+        print(f"Stage timings exported to {TRAINING_METRICS_PATH}")
 
     except Exception as e:
         logging.error("Training pipeline failed: %s", e)
         print(f"Training pipeline failed: {e}")
 
+def train_incremental_pipeline(paths, chunksize=100_000, append=False, state_path="models/incremental_trainer.pkl",
+                               compact_dtypes=False):
+    """
+    Runs the out-of-core training mode:
+    - Streams the raw CSV files in chunks, never holding more than one chunk in memory
+    - Fits imputation statistics and MinMax scaling incrementally, then an SGD logistic model
+    - With append, loads the saved trainer and continues on the new files only (it must exist)
+    - With compact_dtypes, reads every chunk with category/float32 dtypes
+    - Evaluates on a held-out stream and saves the trainer and its metrics
+    """
+    try:
+        if append:
+            if not os.path.exists(state_path):
+                raise FileNotFoundError(f"No saved incremental trainer at {state_path}; run without --append first.")
+            trainer = IncrementalTrainer.load(state_path)
+            # The read dtypes are a choice of this run, not part of the saved model
+            trainer.compact = compact_dtypes
+            trainer.update(paths)
+        else:
+            trainer = IncrementalTrainer(chunksize=chunksize, compact=compact_dtypes).fit(paths)
+
+        metrics = trainer.evaluate(paths)
+        metrics["rows_seen"] = trainer.rows_seen
+        print(f"Incremental model held-out accuracy: {metrics['accuracy']:.2%} "
+              f"on {metrics['holdout_rows']} rows ({trainer.rows_seen} training rows seen)")
+
+        trainer.save(state_path)
+        with open("models/incremental_metrics.json", 'w') as f:
+            json.dump(metrics, f)
+
+    except Exception as e:
+        logging.error("Incremental training pipeline failed: %s", e)
+        print(f"Incremental training pipeline failed: {e}")
+
+def parse_args():
+    """
+    Parses command line arguments for the training pipeline.
+    """
+    parser = argparse.ArgumentParser(description="Train the loan eligibility models.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Total cores used for training (defaults to all cores).")
+    parser.add_argument("--tune", action="store_true",
+                        help="Run a successive-halving hyperparameter search before training.")
+    parser.add_argument("--tune-budget", type=float, default=None,
+                        help="Wall-clock seconds per model after which tuning stops starting new rounds.")
+    parser.add_argument("--streaming", nargs="*", metavar="CSV",
+                        help="Train the incremental model out of core on these files (defaults to the raw dataset).")
+    parser.add_argument("--append", action="store_true",
+                        help="With --streaming, continue the saved incremental model on the given files.")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per chunk in streaming mode.")
+    parser.add_argument("--force", action="store_true", help="Recompute every stage, ignoring the stage cache.")
+    parser.add_argument("--from-stage", choices=STAGES, default=None,
+                        help="Recompute this stage and every later one, reusing cached earlier stages.")
+    parser.add_argument("--compact-dtypes", action="store_true",
+                        help="Load, preprocess and scale with category/uint8/float32 dtypes to cut memory "
+                             "(with --streaming, read the chunks with category/float32 dtypes).")
+    parser.add_argument("--cache-max-mb", type=float, default=STAGE_CACHE_MAX_BYTES / 2**20,
+                        help="Size of the stage cache beyond which the least recently used entries are evicted.")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    train_pipeline()
+    args = parse_args()
+    if args.streaming is not None:
+        train_incremental_pipeline(args.streaming or [RAW_PATH], chunksize=args.chunk_size, append=args.append,
+                                   compact_dtypes=args.compact_dtypes)
+    else:
+        force = STAGES if args.force else STAGES[STAGES.index(args.from_stage):] if args.from_stage else ()
+        train_pipeline(worker_budget=args.workers, tune=args.tune, tune_budget=args.tune_budget, force=force,
+                       cache_max_bytes=int(args.cache_max_mb * 2**20), compact_dtypes=args.compact_dtypes)
     logging.info("Training pipeline completed successfully.")
     